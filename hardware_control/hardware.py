@@ -92,9 +92,8 @@ class HardwareController:
             GPIO.setmode(GPIO.BCM)
             GPIO.setwarnings(False)
             
-            for pin in self.gpio_pins.values():
-                GPIO.setup(pin, GPIO.OUT)
-                GPIO.output(pin, GPIO.LOW)  # Relay ปิดเริ่มต้น (Active HIGH)
+            # setup ทุก pin ในครั้งเดียว — Relay ปิดเริ่มต้น (Active HIGH)
+            GPIO.setup(list(self.gpio_pins.values()), GPIO.OUT, initial=GPIO.LOW)
 
             self._apply_all_states_to_gpio()
             self.is_initialized = True
@@ -107,9 +106,9 @@ class HardwareController:
         """ซิงก์สถานะ relay จริงให้ตรงกับ device_states ใน memory (หลัง setup/re-init)"""
         if not ON_RASPBERRY_PI:
             return
-        for device_key, state in self.device_states.items():
-            pin = self.gpio_pins[device_key]
-            GPIO.output(pin, self._gpio_level_for_state(state))
+        pins = [self.gpio_pins[device_key] for device_key in self.device_states]
+        levels = [self._gpio_level_for_state(state) for state in self.device_states.values()]
+        GPIO.output(pins, levels)
 
     def _reinitialize_gpio(self):
         """Re-init GPIO หลังถูก cleanup โดยโมดูลอื่น แล้วคืนสถานะ relay ตาม memory"""
@@ -148,38 +147,81 @@ class HardwareController:
         self.device_states[device_key] = state
 
         if ON_RASPBERRY_PI:
-            level = self._gpio_level_for_state(state)
+            return self._write_gpio(pin, self._gpio_level_for_state(state), device_key)
+        return True
+
+    def _write_gpio(self, pins, levels, label):
+        """
+        เขียน GPIO (pin เดียว หรือ list ของ pins/levels ในการเรียกครั้งเดียว)
+        ถ้า GPIO ถูก cleanup โดยโมดูลอื่น จะ re-init แล้วลองใหม่ 1 ครั้ง
+        
+        Returns:
+            bool: True ถ้าสำเร็จ
+        """
+        try:
+            GPIO.output(pins, levels)
+        except (RuntimeError, ValueError) as e:
+            # GPIO ถูก cleanup แล้ว ลอง setup ใหม่และลองอีกครั้ง
+            error_msg = str(e)
+            if 'unknown handle' in error_msg.lower() or 'lgpio' in error_msg.lower():
+                print(f"[WARN] GPIO handle error when controlling {label}, re-initializing... ({e})")
+            else:
+                print(f"[WARN] GPIO error when controlling {label}, re-initializing... ({e})")
+            self._reinitialize_gpio()
             try:
-                GPIO.output(pin, level)
-            except (RuntimeError, ValueError) as e:
-                # GPIO ถูก cleanup แล้ว ลอง setup ใหม่และลองอีกครั้ง
-                error_msg = str(e)
-                if 'unknown handle' in error_msg.lower() or 'lgpio' in error_msg.lower():
-                    print(f"[WARN] GPIO handle error when controlling {device_key}, re-initializing... ({e})")
-                else:
-                    print(f"[WARN] GPIO error when controlling {device_key}, re-initializing... ({e})")
-                self._reinitialize_gpio()
+                GPIO.output(pins, levels)
+            except Exception as retry_error:
+                print(f"[WARN] Failed to control {label} after re-initialization: {retry_error}")
+                return False
+        except Exception as e:
+            # จัดการ error อื่นๆ (เช่น lgpio.error)
+            error_msg = str(e)
+            if 'unknown handle' in error_msg.lower() or 'lgpio' in error_msg.lower():
+                print(f"[WARN] GPIO handle error when controlling {label}, re-initializing... ({e})")
                 try:
-                    GPIO.output(pin, level)
+                    self._reinitialize_gpio()
+                    GPIO.output(pins, levels)
                 except Exception as retry_error:
-                    print(f"[WARN] Failed to control {device_key} after re-initialization: {retry_error}")
-                    return False
-            except Exception as e:
-                # จัดการ error อื่นๆ (เช่น lgpio.error)
-                error_msg = str(e)
-                if 'unknown handle' in error_msg.lower() or 'lgpio' in error_msg.lower():
-                    print(f"[WARN] GPIO handle error when controlling {device_key}, re-initializing... ({e})")
-                    try:
-                        self._reinitialize_gpio()
-                        GPIO.output(pin, level)
-                    except Exception as retry_error:
-                        print(f"[WARN] Failed to control {device_key} after re-initialization: {retry_error}")
-                        return False
-                else:
-                    print(f"[WARN] Unexpected GPIO error when controlling {device_key}: {e}")
+                    print(f"[WARN] Failed to control {label} after re-initialization: {retry_error}")
                     return False
-            
+            else:
+                print(f"[WARN] Unexpected GPIO error when controlling {label}: {e}")
+                return False
         return True
+
+    def set_many(self, states):
+        """
+        ตั้งค่าหลายอุปกรณ์ใน GPIO.output ครั้งเดียว (ปิดก่อน แล้วค่อยเปิด)
+        
+        Args:
+            states (dict): {device_key: bool} — True = ON, False = OFF
+            
+        Returns:
+            bool: True ถ้าสำเร็จ, False ถ้ามีอุปกรณ์ที่ไม่รู้จักหรือ GPIO ล้มเหลว
+        """
+        ok = True
+        ordered = []
+        for device_key, state in states.items():
+            if device_key not in self.gpio_pins:
+                print(f"[WARN] Unknown device: {device_key}")
+                ok = False
+                continue
+            ordered.append((device_key, bool(state)))
+        if not ordered:
+            return ok
+        # sort แบบ stable: OFF (False) มาก่อน ON (True)
+        ordered.sort(key=lambda item: item[1])
+
+        self._ensure_gpio_setup()
+        for device_key, state in ordered:
+            self.device_states[device_key] = state
+
+        if ON_RASPBERRY_PI:
+            pins = [self.gpio_pins[key] for key, _ in ordered]
+            levels = [self._gpio_level_for_state(state) for _, state in ordered]
+            label = ", ".join(key for key, _ in ordered)
+            ok = self._write_gpio(pins, levels, label) and ok
+        return ok
         
     def turn_on(self, device_key):
         """
@@ -245,6 +287,19 @@ class HardwareController:
         """
         return self.device_states.copy()
         
+    def changed_states(self, states):
+        """
+        คัดเฉพาะอุปกรณ์ที่สถานะใน memory ต่างจาก states (ไม่ copy สถานะทั้งหมด)
+        
+        Args:
+            states (dict): {device_key: bool} สถานะที่ต้องการ
+            
+        Returns:
+            dict: {device_key: bool} เฉพาะตัวที่ต้องเขียนจริง (ว่าง = ตรงกันหมดแล้ว)
+        """
+        current = self.device_states
+        return {key: state for key, state in states.items() if current.get(key) != state}
+        
     def set_multiple_devices(self, devices_on=None, devices_off=None):
         """
         ตั้งค่าหลายอุปกรณ์พร้อมกัน
@@ -253,20 +308,15 @@ class HardwareController:
             devices_on (list): รายการอุปกรณ์ที่ต้องการเปิด
             devices_off (list): รายการอุปกรณ์ที่ต้องการปิด
         """
-        if devices_off:
-            for device in devices_off:
-                self.turn_off(device)
-                
-        if devices_on:
-            for device in devices_on:
-                self.turn_on(device)
+        states = dict.fromkeys(devices_off or [], False)
+        states.update(dict.fromkeys(devices_on or [], True))
+        self.set_many(states)
                 
     def all_off(self):
         """
         ปิดอุปกรณ์ทั้งหมด
         """
-        for device_key in self.device_states.keys():
-            self.turn_off(device_key)
+        self.set_many(dict.fromkeys(self.device_states, False))
         print("[OK] All devices turned OFF")
         
     def cleanup(self):
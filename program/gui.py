@@ -7,16 +7,39 @@ GUI สำหรับควบคุม Relay และอุปกรณ์ต
 Author: eNose Project
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox
 import time
 import threading
+import multiprocessing
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait as wait_futures,
+)
+from concurrent.futures.process import BrokenProcessPool
+import copy
 import json
+import math
+from collections import deque
+from functools import partial
 import os
+import zlib
 import sys
 from pathlib import Path
 import traceback
 
+# process ลูกของ pool แบบ spawn (collection / processing) รันไฟล์นี้ซ้ำในชื่อ __mp_main__
+# child ใช้แค่ฟังก์ชันใน reading/ และ acquisition/ — ข้าม import ฝั่ง UI (Tk, hardware, matplotlib, pandas, cloud)
+_SPAWNED_CHILD = __name__ == '__mp_main__'
+
+if not _SPAWNED_CHILD:
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    from tkinter import font as tkfont
+
+# จำกัด BLAS/OpenMP ให้ใช้ 1 thread (ต้องตั้งก่อน import numpy) — ระบบมี collection threads,
+# Tk และ processing process ทำงานพร้อมกันอยู่แล้ว ถ้า BLAS แตก thread เต็มทุก core จะแย่ง CPU
+# กับการอ่าน ADC; processing process (spawn) สืบทอดค่านี้ไปด้วย
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
 # เพิ่ม path สำหรับ import hardware controller และ modules อื่นๆ
 _project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(_project_root)
@@ -24,76 +47,105 @@ sys.path.append(str(Path(_project_root) / "reading"))
 sys.path.append(str(Path(_project_root) / "acquisition"))
 
 # Import Hardware Controller
-from hardware_control.hardware import HardwareController, is_raspberry_pi, DEFAULT_GPIO_PINS
+if not _SPAWNED_CHILD:
+    from hardware_control.hardware import HardwareController, is_raspberry_pi, DEFAULT_GPIO_PINS
+
+# ฟังก์ชันของ collection process (โมดูลเบา — ไม่ดึง Tk/pandas เข้า child)
+from reading.collect_worker import CollectionStop, collect_in_worker, init_collection_worker, warm_up
+
+# Data Collection / Processing / Predict modules — ดึง numpy, pandas, ADS1263 มาด้วย
+# ไม่ import ตอนโหลด gui.py (ช้าบน Pi): HardwareControlGUI เริ่ม import ใน background
+# แล้ว start_operation เรียก _ensure_pipeline_imports() รอให้เสร็จก่อนใช้งานจริง
+DATA_COLLECTION_AVAILABLE = False
+run_collection = None
+BME_COLLECTION_AVAILABLE = False
+run_bme_collection = None
+DATA_PROCESSING_AVAILABLE = False
+process_all_data = None
+PREDICT_AVAILABLE = False
+predict_ppm = None
+_pipeline_imports_lock = threading.Lock()
+_pipeline_imports_done = False
+
+
+def _ensure_pipeline_imports():
+    """import โมดูล pipeline ครั้งเดียว (thread-safe) แล้วตั้ง *_AVAILABLE ตามผล"""
+    global DATA_COLLECTION_AVAILABLE, run_collection
+    global BME_COLLECTION_AVAILABLE, run_bme_collection
+    global DATA_PROCESSING_AVAILABLE, process_all_data
+    global PREDICT_AVAILABLE, predict_ppm
+    global _pipeline_imports_done
+    with _pipeline_imports_lock:
+        if _pipeline_imports_done:
+            return
+        try:
+            from reading.main import run_collection
+            DATA_COLLECTION_AVAILABLE = True
+        except ImportError as e:
+            print(f"Warning: Could not import reading.main: {e}")
 
-# Import Data Collection and Processing modules
-try:
-    from reading.main import run_collection
-    DATA_COLLECTION_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: Could not import reading.main: {e}")
-    DATA_COLLECTION_AVAILABLE = False
-    run_collection = None
+        try:
+            from reading.bme280 import run_bme_collection
+            BME_COLLECTION_AVAILABLE = True
+        except ImportError as e:
+            print(f"Warning: Could not import reading.bme280: {e}")
 
-try:
-    from reading.bme280 import run_bme_collection
-    BME_COLLECTION_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: Could not import reading.bme280: {e}")
-    BME_COLLECTION_AVAILABLE = False
-    run_bme_collection = None
+        try:
+            from acquisition.acquisiton import process_all_data
+            DATA_PROCESSING_AVAILABLE = True
+        except ImportError as e:
+            print(f"Warning: Could not import acquisition.acquisiton: {e}")
 
-try:
-    from acquisition.acquisiton import process_all_data
-    DATA_PROCESSING_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: Could not import acquisition.acquisiton: {e}")
-    DATA_PROCESSING_AVAILABLE = False
-    process_all_data = None
+        try:
+            from predict_methane import predict_ppm
+            PREDICT_AVAILABLE = True
+        except ImportError as e:
+            print(f"Warning: Could not import predict_methane: {e}")
+        _pipeline_imports_done = True
 
+# orjson (optional) — parse config เร็วกว่า json ของ stdlib, ไม่มีก็ใช้ json ตามเดิม (เขียนใช้ json เสมอ)
 try:
-    from predict_methane import predict_ppm
-    PREDICT_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: Could not import predict_methane: {e}")
-    PREDICT_AVAILABLE = False
-    predict_ppm = None
-
-# Matplotlib สำหรับกราฟการแสดงผล (Process Data)
-try:
-    import matplotlib
-    matplotlib.use('TkAgg')
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    from matplotlib.figure import Figure
-    from matplotlib.colors import to_hex
-    MATPLOTLIB_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    to_hex = None
+    orjson = None
+    ORJSON_AVAILABLE = False
 
-# Pandas สำหรับโหลดข้อมูล processed (ใช้ในหน้าจอการแสดงผล)
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+# โมดูลฝั่ง UI (ไม่โหลดใน spawn child — ดู _SPAWNED_CHILD)
+if not _SPAWNED_CHILD:
+    # Matplotlib สำหรับกราฟการแสดงผล (Process Data)
+    try:
+        import matplotlib
+        matplotlib.use('TkAgg')
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        MATPLOTLIB_AVAILABLE = True
+    except ImportError:
+        MATPLOTLIB_AVAILABLE = False
+
+    # Pandas สำหรับโหลดข้อมูล processed (ใช้ในหน้าจอการแสดงผล)
+    try:
+        import pandas as pd
+        PANDAS_AVAILABLE = True
+    except ImportError:
+        PANDAS_AVAILABLE = False
 
-try:
-    from cloud.uploader import is_enabled as cloud_upload_is_enabled, upload_cycle_files
-    CLOUD_UPLOAD_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: Could not import cloud.uploader: {e}")
-    CLOUD_UPLOAD_AVAILABLE = False
-    cloud_upload_is_enabled = lambda: False  # noqa: E731
-    upload_cycle_files = None
+    try:
+        from cloud.uploader import is_enabled as cloud_upload_is_enabled, upload_cycle_files
+        CLOUD_UPLOAD_AVAILABLE = True
+    except ImportError as e:
+        print(f"Warning: Could not import cloud.uploader: {e}")
+        CLOUD_UPLOAD_AVAILABLE = False
+        cloud_upload_is_enabled = lambda: False  # noqa: E731
+        upload_cycle_files = None
 
-try:
-    from cloud.config import load_cloud_config, save_cloud_config
-    CLOUD_CONFIG_AVAILABLE = True
-except ImportError:
-    CLOUD_CONFIG_AVAILABLE = False
-    load_cloud_config = None
-    save_cloud_config = None
+    try:
+        from cloud.config import load_cloud_config, save_cloud_config
+        CLOUD_CONFIG_AVAILABLE = True
+    except ImportError:
+        CLOUD_CONFIG_AVAILABLE = False
+        load_cloud_config = None
+        save_cloud_config = None
 
 
 # ==================== CONFIG FILE ====================
@@ -117,6 +169,30 @@ DEFAULT_CONFIG = {
     }
 }
 
+# ค่า default ของ duration แต่ละ operation (วินาที)
+OPERATION_DEFAULTS = DEFAULT_CONFIG["operation_times"]
+
+# สีพื้นหลัง / สีข้อความหลักที่ใช้ทั่วทั้งหน้าจอ
+BG_COLOR = '#f0f0f0'
+DARK_COLOR = '#2c3e50'
+
+# ฟอนต์ที่ใช้ซ้ำ — ทุก widget ใช้ tuple เดียวกัน (_register_scalable จับกลุ่มตาม (family, size, weight))
+FONT_FAMILY = 'Helvetica'
+FONT_9 = (FONT_FAMILY, 9)
+FONT_10 = (FONT_FAMILY, 10)
+FONT_10_BOLD = (FONT_FAMILY, 10, 'bold')
+FONT_11 = (FONT_FAMILY, 11)
+FONT_11_BOLD = (FONT_FAMILY, 11, 'bold')
+FONT_12 = (FONT_FAMILY, 12)
+FONT_12_BOLD = (FONT_FAMILY, 12, 'bold')
+FONT_13_BOLD = (FONT_FAMILY, 13, 'bold')
+FONT_14_BOLD = (FONT_FAMILY, 14, 'bold')
+FONT_15_BOLD = (FONT_FAMILY, 15, 'bold')
+FONT_16_BOLD = (FONT_FAMILY, 16, 'bold')
+FONT_24_BOLD = (FONT_FAMILY, 24, 'bold')
+FONT_28_BOLD = (FONT_FAMILY, 28, 'bold')
+FONT_32_BOLD = (FONT_FAMILY, 32, 'bold')
+
 STATUS_COLORS = {
     "idle": "#e74c3c",
     "running": "#3498db",
@@ -125,10 +201,58 @@ STATUS_COLORS = {
     "processing": "#9b59b6",
 }
 
+# จำนวน collection process (ADC + BME280 รันพร้อมกัน process ละตัว)
+COLLECTION_WORKERS = 2
+
 # Max wait time (seconds) when stopping collection threads from Stop button.
 # Prevents UI from feeling stuck if a sensor read blocks longer than expected.
 STOP_THREAD_JOIN_TIMEOUT_SEC = 5
 
+# เวลารอ collection ของรอบก่อนหยุดก่อนเริ่ม cycle ใหม่ (วินาที — ADC + BME280 รอพร้อมกัน)
+CLEANUP_WAIT_TIMEOUT_SEC = 2
+
+# รอให้ <Configure> หยุดยิงกี่ ms ก่อน scale UI (กันการ scale ทุก pixel ตอนลาก resize)
+RESIZE_DEBOUNCE_MS = 50
+
+# รอให้หยุดพิมพ์ค่า duration กี่ ms ก่อนสร้าง cycle plan ใหม่ (ไม่ rebuild ทุกตัวอักษร)
+DURATION_DEBOUNCE_MS = 300
+
+# debounce <Configure> ของ content canvas/frame (ms) — ตอนสร้าง layout ยิงติดกันหลายสิบครั้ง
+SCROLL_DEBOUNCE_MS = 30
+
+# สีกล่อง switch ของ Manual mode: is_on -> (พื้น, ตัวอักษร)
+DEVICE_BOX_COLORS = {
+    True: ('#27ae60', '#1a1a1a'),
+    False: ('#e0e0e0', DARK_COLOR),
+}
+
+# ข้อความสถานะอุปกรณ์ใน status bar
+DEVICE_STATE_TEXT = {True: 'ON', False: 'OFF'}
+
+# เวลาแสดง toast (ms) ก่อนซ่อนเอง
+TOAST_DURATION_MS = 1500
+
+# event ของ mouse wheel (Windows/macOS = MouseWheel, X11 = Button-4/5)
+MOUSEWHEEL_EVENTS = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+# รอบ flush label ที่อัพเดทถี่ (timer/progress/status) — ms
+UI_TICK_MS = 100
+
+# virtual event ที่ worker ใช้ปลุก UI thread ให้ดึงงานจาก _ui_queue
+UI_WAKE_EVENT = '<<WorkerUpdate>>'
+
+# เวลารอ relay นิ่งหลังสลับอุปกรณ์ใน auto sequence (วินาที)
+RELAY_SETTLE_SEC = 0.3
+
+# พิมพ์ความคืบหน้าของ collection ทุก cycle (start/saved) — ปิดไว้ใน production, error ยังพิมพ์เสมอ
+COLLECTION_VERBOSE = False
+
+# เวลารอผล process_all_data จาก process pool (วินาที) ก่อนถือว่าล้มเหลว
+PROCESSING_RESULT_TIMEOUT_SEC = 120
+
+# lookup "00".."99" สำหรับข้อความ MM:SS ของ timer (ไม่ต้อง format ทุก tick)
+_TWO_DIGITS = tuple(f"{i:02d}" for i in range(100))
+
 OPERATION_FRAME_COLORS = {
     'heating': '#fff59d',
     'baseline': '#81d4fa',
@@ -140,22 +264,55 @@ OPERATION_FRAME_COLORS = {
     'break_time': '#ffcdd2'
 }
 
-AUTO_OPERATION_STEPS = [
+# แถวของหน้า Settings: (label, op key, คำอธิบาย) — สีใช้ OPERATION_FRAME_COLORS[key]
+OPERATION_PARAMETER_ROWS = (
+    ("Heating (30m)", 'heating', "Heater ON"),
+    ("Baseline (30s)", 'baseline', "SV1+SV3+Pump"),
+    ("Vacuum (10s)", 'vacuum', "SV3+Pump"),
+    ("Mix Air (10s)", 'mix_air', "Fan ON"),
+    ("Measure (60s)", 'measure', "SV2+Pump [Data]"),
+    ("Vac Return (10s)", 'vacuum_return', "Pump+SV4 [Process]"),
+    ("Recovery (60s)", 'recovery', "SV1+SV3+Pump"),
+)
+
+# switch ของ Manual mode: (ชื่อที่แสดง, device key) แยกคอลัมน์ซ้าย/ขวา
+MANUAL_DEVICES_LEFT = (
+    ('Value 1', 's_valve1'),
+    ('Value 2', 's_valve2'),
+    ('Value 3', 's_valve3'),
+    ('Value 4', 's_valve4'),
+)
+MANUAL_DEVICES_RIGHT = (
+    ('Pump', 'pump'),
+    ('Fan', 'fan'),
+    ('Heater', 'heater'),
+)
+MANUAL_DEVICES = MANUAL_DEVICES_LEFT + MANUAL_DEVICES_RIGHT
+
+# สีของ op frame ตามสถานะ — ใช้เป็น ttk style 'Op.<State>.TFrame'
+OPERATION_STATE_COLORS = {
+    'Active': STATUS_COLORS["warning"],
+    'Done': '#81c784',
+    'Bypassed': '#bdbdbd',
+    'Break': '#e57373',
+}
+
+AUTO_OPERATION_STEPS = (
     {
         "op_key": "heating",
         "ui_title": "Op1: Heating",
         "duration_key": "heating",
         "countdown_title": "Op1: Heating",
-        "on": ["heater"],
-        "off": ['s_valve1', 's_valve2', 's_valve3', 's_valve4', 'pump', 'fan']
+        "on": ("heater",),
+        "off": ('s_valve1', 's_valve2', 's_valve3', 's_valve4', 'pump', 'fan')
     },
     {
         "op_key": "baseline",
         "ui_title": "Op2: Baseline [Recording]",
         "duration_key": "baseline",
         "countdown_title": "Op2: Baseline",
-        "on": ['s_valve2', 's_valve3', 'pump'],
-        "off": ['s_valve1', 's_valve4'],
+        "on": ('s_valve2', 's_valve3', 'pump'),
+        "off": ('s_valve1', 's_valve4'),
         "start_collection": True
     },
     {
@@ -163,42 +320,50 @@ AUTO_OPERATION_STEPS = [
         "ui_title": "Op3: Vacuum",
         "duration_key": "vacuum",
         "countdown_title": "Op3: Vacuum",
-        "on": ['s_valve3', 'pump'],
-        "off": ['s_valve1', 's_valve2', 's_valve4']
+        "on": ('s_valve3', 'pump'),
+        "off": ('s_valve1', 's_valve2', 's_valve4')
     },
     {
         "op_key": "mix_air",
         "ui_title": "Op4: Mix Air",
         "duration_key": "mix_air",
         "countdown_title": "Op4: Mix Air",
-        "on": ['fan'],
-        "off": ['s_valve1', 's_valve2', 's_valve3', 's_valve4', 'pump']
+        "on": ('fan',),
+        "off": ('s_valve1', 's_valve2', 's_valve3', 's_valve4', 'pump')
     },
     {
         "op_key": "measure",
         "ui_title": "Op5: Measure",
         "duration_key": "measure",
         "countdown_title": "Op5: Measure [Recording]",
-        "on": ['s_valve1', 's_valve4', 'pump'],
-        "off": ['fan', 's_valve2', 's_valve3']
+        "on": ('s_valve1', 's_valve4', 'pump'),
+        "off": ('fan', 's_valve2', 's_valve3')
     },
     {
         "op_key": "vacuum_return",
         "ui_title": "Op6: Vacuum Return",
         "duration_key": "vacuum_return",
         "countdown_title": "Op6: Vacuum Return",
-        "on": ['s_valve4', 'pump'],
-        "off": ['s_valve1', 's_valve2', 's_valve3']
+        "on": ('s_valve4', 'pump'),
+        "off": ('s_valve1', 's_valve2', 's_valve3')
     },
     {
         "op_key": "recovery",
         "ui_title": "Op7: Recovery",
         "duration_key": "recovery",
         "countdown_title": "Op7: Recovery",
-        "on": ['s_valve2', 's_valve3'],
-        "off": ['s_valve1', 's_valve4']
+        "on": ('s_valve2', 's_valve3'),
+        "off": ('s_valve1', 's_valve4')
     },
-]
+)
+
+# สถานะอุปกรณ์ของแต่ละ step คำนวณครั้งเดียวตอนโหลด module — sequencer ไม่ต้องสร้าง dict ใหม่ทุก cycle
+for _step in AUTO_OPERATION_STEPS:
+    _step["states"] = {**dict.fromkeys(_step["off"], False), **dict.fromkeys(_step["on"], True)}
+del _step
+
+# อุปกรณ์ที่คงไว้เปิดหลังจบ cycle / Stop (Auto sequence เปิด heater ตลอด Op1–Op7)
+CYCLE_PRESERVED_DEVICES = ('heater',)
 
 # ขั้นตอนที่เก็บข้อมูล ADC (หลัง Heating) — ใช้เมื่อ Baseline ถูก bypass (duration=0)
 RECORDING_OP_KEYS = frozenset({
@@ -206,14 +371,36 @@ RECORDING_OP_KEYS = frozenset({
 })
 
 
-def load_config():
-    """โหลด config จากไฟล์"""
-    if os.path.exists(CONFIG_FILE):
+# config ที่อ่านล่าสุด — อ่านไฟล์ใหม่เฉพาะเมื่อ mtime เปลี่ยน (load_config ถูกเรียกทุก cycle)
+_CONFIG_CACHE = {"mtime": None, "data": None}
+_CONFIG_LOCK = threading.Lock()
+
+
+def load_config(copy_result=True):
+    """โหลด config จากไฟล์ (memoize ตาม mtime — คืน copy ให้ผู้เรียกแก้ได้อิสระ)
+
+    copy_result=False คืน dict ใน cache ตรงๆ (ไม่ deepcopy) — ใช้กับผู้เรียกที่อ่านอย่างเดียว ห้ามแก้
+    """
+    clone = copy.deepcopy if copy_result else (lambda data: data)
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime is not None:
+        with _CONFIG_LOCK:
+            if _CONFIG_CACHE["mtime"] == mtime:
+                return clone(_CONFIG_CACHE["data"])
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                print(f"✓ Loaded config from {CONFIG_FILE}")
-                return config
+            if ORJSON_AVAILABLE:
+                config = orjson.loads(Path(CONFIG_FILE).read_bytes())
+            else:
+                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            print(f"✓ Loaded config from {CONFIG_FILE}")
+            with _CONFIG_LOCK:
+                _CONFIG_CACHE["mtime"] = mtime
+                _CONFIG_CACHE["data"] = config
+            return clone(config)
         except json.JSONDecodeError as e:
             print(f"⚠ Error parsing config file {CONFIG_FILE}: {e}")
             print("  Using default config instead")
@@ -230,30 +417,61 @@ def save_config(config):
     """บันทึก config ลงไฟล์"""
     try:
         os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+        # เขียนด้วย json เสมอ — orjson รองรับแค่ indent 2 ไฟล์จะเปลี่ยนรูปแบบตามเครื่องที่รัน
         with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=4, ensure_ascii=False)
+        # อัพเดท cache ทันที — mtime บน SD card (FAT) ละเอียดแค่ 2 วินาที
+        with _CONFIG_LOCK:
+            _CONFIG_CACHE["mtime"] = os.stat(CONFIG_FILE).st_mtime_ns
+            _CONFIG_CACHE["data"] = copy.deepcopy(config)
         print(f"✓ Saved config to {CONFIG_FILE}")
     except Exception as e:
         print(f"✗ Error saving config to {CONFIG_FILE}: {e}")
         raise
 
 
+def format_mmss(seconds):
+    """แปลงวินาทีเป็น 'MM:SS' (นาที >= 100 ใช้ f-string ตามปกติ)"""
+    mins, secs = divmod(int(seconds), 60)
+    if mins < 100:
+        return _TWO_DIGITS[mins] + ":" + _TWO_DIGITS[secs]
+    return f"{mins:02d}:{secs:02d}"
+
+
+class _CycleState:
+    """สถานะ operation ปัจจุบันของ auto sequence (slots — เขียนบ่อยทุก step)"""
+    __slots__ = ('op', 'op_idx')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """ไม่มี operation ที่กำลังรัน"""
+        self.op = None
+        self.op_idx = -1
+
+
 # ==================== MAIN GUI CLASS ====================
 class HardwareControlGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("eNose Hardware Control")
-        self.root.configure(bg='#f0f0f0')
+        self.root.configure(bg=BG_COLOR)
         self.root.resizable(True, True)
+        # ซ่อน window ระหว่างสร้าง widget — Tk คำนวณ layout รอบเดียวตอน deiconify
+        self.root.withdraw()
         
         # Fixed window size 480x800 (portrait)
         self.is_maximized = False
         self.root.geometry("480x800")
-        self.root.update_idletasks()
-        screen_w = self.root.winfo_width()
-        screen_h = self.root.winfo_height()
+        # window ยังไม่ถูก map (winfo_width = 1) — ใช้ขนาดที่ตั้งไว้เป็นฐานการ scale
+        screen_w, screen_h = 480, 800
         
         # Bind window resize event
+        self._resize_after_id = None
+        self._last_scaled_size = None
+        self._scrollregion_after_id = None
+        self._canvas_width_after_id = None
         self.root.bind('<Configure>', self.on_window_resize)
         self.root.bind('<F11>', self.toggle_maximized)
         self.root.bind('<Escape>', lambda e: self.exit_maximized() if self.is_maximized else None)
@@ -277,8 +495,9 @@ class HardwareControlGUI:
             'small': 10
         }
         
-        # Store widget references for scaling
+        # named font ของ widget ที่ scale ได้: widget_type -> {(family, size, weight): tkfont.Font}
         self.scalable_widgets = {}
+        self._applied_font_sizes = {}  # widget_type -> font size ที่ scale_ui ตั้งล่าสุด
         
         # Load config
         self.config = load_config()
@@ -288,44 +507,95 @@ class HardwareControlGUI:
         
         # สร้าง Hardware Controller
         self.hardware = HardwareController(gpio_pins)
+        # สถานะปิดอุปกรณ์ตอนจบ cycle (ยกเว้น CYCLE_PRESERVED_DEVICES) — เตรียมครั้งเดียว
+        self._cycle_end_states = {
+            dev: False for dev in self.hardware.available_devices
+            if dev not in CYCLE_PRESERVED_DEVICES
+        }
+        # สถานะ OFF ทั้งหมดตอน Stop แยกตามชุดอุปกรณ์ที่คงไว้ (tuple ของ preserve -> {device: False})
+        self._off_state_maps = {
+            (): dict.fromkeys(self.hardware.available_devices, False),
+            CYCLE_PRESERVED_DEVICES: self._cycle_end_states,
+        }
         self.hardware.setup()
         
         # Operation durations (seconds) - จาก config
         op_times = self.config.get("operation_times", DEFAULT_CONFIG["operation_times"])
         self.operation_durations = {
-            'heating': tk.StringVar(value=str(op_times.get("heating", 1800))),
-            'baseline': tk.StringVar(value=str(op_times.get("baseline", 30))),
-            'vacuum': tk.StringVar(value=str(op_times.get("vacuum", 10))),
-            'mix_air': tk.StringVar(value=str(op_times.get("mix_air", 10))),
-            'measure': tk.StringVar(value=str(op_times.get("measure", 60))),
-            'vacuum_return': tk.StringVar(value=str(op_times.get("vacuum_return", 10))),
-            'recovery': tk.StringVar(value=str(op_times.get("recovery", 60))),
-            'break_time': tk.StringVar(value=str(op_times.get("break_time", 1620)))
+            key: tk.StringVar(value=str(op_times.get(key, default)))
+            for key, default in OPERATION_DEFAULTS.items()
         }
-        
+
+        # cache ค่า duration (int) — parse ใหม่เฉพาะเมื่อ StringVar ถูกเขียน
+        self._durations = {}
+        self._cycle_plan = []
+        self._loop_limit = None  # จำนวน cycle สูงสุด (None = infinite) — อ่านตอนกด Start
+        self._durations_after_id = None
+        self._refresh_durations()
+        for var in self.operation_durations.values():
+            var.trace_add('write', self._schedule_refresh_durations)
+
         # Auto settings
-        auto_settings = self.config.get("auto_settings", DEFAULT_CONFIG["auto_settings"])
-        self.loop_count = tk.StringVar(value=str(auto_settings.get("loop_count", 0)))
-        self.infinite_loop = tk.BooleanVar(value=auto_settings.get("infinite_loop", True))
+        auto_defaults = DEFAULT_CONFIG["auto_settings"]
+        auto_settings = self.config.get("auto_settings", auto_defaults)
+        self.loop_count = tk.StringVar(
+            value=str(auto_settings.get("loop_count", auto_defaults["loop_count"])))
+        self.infinite_loop = tk.BooleanVar(
+            value=auto_settings.get("infinite_loop", auto_defaults["infinite_loop"]))
         
         # Control flags
         self.current_mode = tk.StringVar(value="manual")  # "manual" or "auto"
-        self.running = False
-        self.current_operation = None
-        self.current_operation_index = -1
+        self._cfg_cache = {}      # ค่า option ล่าสุดต่อ widget (ดู _cached_configure)
+        self._label_vars = {}     # Tk path -> StringVar ของ label ที่ใช้ textvariable
+        self._ui_queue = deque()  # callback จาก worker threads ที่รอรันบน UI thread
+        self._ui_flush_lock = threading.Lock()
+        self._ui_flush_scheduled = False
+        self.root.bind(UI_WAKE_EVENT, self._flush_ui_queue)
+        # label ที่อัพเดทถี่ (timer/progress/status) — เก็บค่าล่าสุดไว้ แล้ว _ui_tick flush ทุก UI_TICK_MS
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._ui_tick_id = None
+        # state machine ของ auto sequence (ขับด้วย root.after บน UI thread) — None = ไม่ได้รัน
+        self._fsm_state = None
+        self._auto_tick_id = None
+        # เลขรอบของ auto run — callback จาก _seq_pool ที่ค้างจาก run ก่อน (เลขไม่ตรง) ถูกทิ้ง
+        self._auto_run_id = 0
+        # True ตั้งแต่ Start จน _auto_complete (รวมช่วงรอ processing ของ cycle สุดท้าย) — กัน manual toggle
+        self._auto_active = False
+        self._auto_status = ("", STATUS_COLORS["idle"])  # (ข้อความ, สี) ของ status ระหว่าง countdown
+        # stop flag ตัวเดียวของ operation — running คือ "ยังไม่ถูก set" (ดู property running)
+        # ผู้รอ (manual timer / relay settle) ตื่นทันทีเมื่อ set
+        self._stop = threading.Event()
+        self._stop.set()
+        self._cs = _CycleState()  # operation ปัจจุบัน (op, op_idx)
         self.current_cycle = 0
         
         # Data collection and processing threads
         self.stop_collection_event = None
-        self.data_collection_thread = None
-        self.bme_collection_thread = None  # thread สำหรับ BME280 (คู่ขนานกับ ADC)
+        self.data_collection_future = None
+        self.bme_collection_future = None  # future สำหรับ BME280 (คู่ขนานกับ ADC)
+        # worker pool ใช้ซ้ำทุก cycle (ADC + BME280 + manual timer) แทนการสร้าง thread ใหม่ทุกครั้ง
+        # thread แค่รอผล — loop อ่าน sensor จริงรันใน _collection_pool
+        self._io_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='io')
+        # ใช้ spawn เพราะ fork process ที่มี Tk + threads ไม่ปลอดภัย
+        mp_spawn = multiprocessing.get_context('spawn')
+        # ADC + BME280 sampling loop รันใน process แยก (ค้างไว้ใช้ซ้ำ) ไม่แย่ง GIL กับ Tk
+        self._collection_pool_lock = threading.Lock()
+        self._collection_generation, self._collection_pool = self._create_collection_pool()
+        # process_all_data (CPU หนัก) รันใน process แยก ไม่แย่ง GIL กับ collection/Tk
+        self._process_pool = ProcessPoolExecutor(max_workers=1, mp_context=mp_spawn)
+        # งานหลังจบ cycle (รอผล process + upload + predict) ทีละ cycle ตามลำดับ
+        self._post_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='post')
+        # งานที่บล็อกของ auto sequence (สลับ relay + รอนิ่ง, หยุด collection) ทีละงานตามลำดับ
+        self._seq_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='seq')
+        self._pending_process_futures = []
         self.data_collection_file_path = None  # เก็บ path ของไฟล์ที่เก็บข้อมูล ADC
         self.bme_collection_file_path = None   # เก็บ path ของไฟล์ที่เก็บข้อมูล BME280
-        self._stop_worker_thread = None        # worker ที่ทำงานหลังกด Stop (manual)
         self._stopping_in_progress = False     # กันการกด Stop ซ้ำ
+        self._closing = False                  # กันการปิดหน้าต่างซ้ำระหว่างรอ save
 
         # Manual timer state
-        self.manual_timer_thread = None
+        self.manual_timer_future = None
         self.manual_timer_stop_event = None
 
         # Virtual numpad (ช่องตัวเลขที่โฟกัสล่าสุด)
@@ -333,17 +603,34 @@ class HardwareControlGUI:
         self._numpad_mode = 'int'  # 'int' | 'mmss'
         self._numpad_suppress_focus_until = 0.0
         self.numpad_colon_btn = None
+
+        # Toast popup (สร้างตอนใช้ครั้งแรก ใช้ซ้ำ)
+        self._toast_window = None
+        self._toast_label = None
+        self._toast_after_id = None
         
         # Page navigation
         self.current_page = tk.StringVar(value="control")
         self.pages = {}
         self.nav_buttons = {}
+        # widget ของหน้า Settings (ว่างจนกว่าหน้าจะถูกสร้างครั้งแรก)
+        self.operation_entries = {}
+        self.operation_frames = {}
+        self._styled_ops = set()  # op_key ที่ frame ถูกเปลี่ยนสีจาก idle (reset_operation_colors คืนเฉพาะตัวนี้)
         
+        # ttk styles ของ op frame (สร้างครั้งเดียว, สลับสถานะด้วย style แทน bg)
+        self._init_operation_styles()
+
+        # import โมดูล pipeline คู่ขนานกับการสร้าง UI (ใช้จริงตอนกด Start)
+        threading.Thread(target=_ensure_pipeline_imports, name='pipeline-import', daemon=True).start()
+
         # Create UI
         self.create_main_layout()
+        self._ui_tick()
         
         # Update window after creating UI
         self.root.update_idletasks()
+        self.root.deiconify()
         
     # ==================== MAXIMIZE & RESIZE HANDLERS ====================
     def _maximize(self):
@@ -376,17 +663,69 @@ class HardwareControlGUI:
         self.root.geometry("480x800")
     
     def on_window_resize(self, event):
-        """Handle window resize event"""
+        """Handle window resize event (debounce — scale ครั้งเดียวหลัง Configure หยุดมา RESIZE_DEBOUNCE_MS)"""
         if event.widget == self.root:
-            # Update window size for scaling calculations
-            width = self.root.winfo_width()
-            height = self.root.winfo_height()
-            
-            # Prevent division by zero
-            if width > 0 and height > 0:
-                # Scale UI elements if needed
-                if hasattr(self, 'main_frame') and hasattr(self, 'scalable_widgets'):
-                    self.scale_ui(width, height)
+            if self._resize_after_id is not None:
+                self.root.after_cancel(self._resize_after_id)
+            self._resize_after_id = self.root.after(RESIZE_DEBOUNCE_MS, self._apply_resize)
+
+    def _schedule_scrollregion(self, event=None):
+        """debounce <Configure> ของ content frame — คำนวณ bbox ครั้งเดียวหลัง layout นิ่ง"""
+        if self._scrollregion_after_id is not None:
+            self.root.after_cancel(self._scrollregion_after_id)
+        self._scrollregion_after_id = self.root.after(SCROLL_DEBOUNCE_MS, self._do_scrollregion)
+
+    def _do_scrollregion(self):
+        self._scrollregion_after_id = None
+        bbox = self.content_canvas.bbox('all')
+        if bbox:
+            self.content_canvas.configure(scrollregion=bbox)
+
+    def _schedule_canvas_width(self, event=None):
+        """debounce <Configure> ของ canvas — ปรับความกว้าง content ให้เท่า canvas ครั้งเดียว"""
+        if self._canvas_width_after_id is not None:
+            self.root.after_cancel(self._canvas_width_after_id)
+        self._canvas_width_after_id = self.root.after(SCROLL_DEBOUNCE_MS, self._do_canvas_width)
+
+    def _do_canvas_width(self):
+        self._canvas_width_after_id = None
+        canvas_width = self.content_canvas.winfo_width()
+        if canvas_width > 1:
+            self.content_canvas.itemconfig(self.content_canvas_window, width=canvas_width)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.content_canvas.yview_scroll(-1, "units")
+        elif event.num == 5 or event.delta < 0:
+            self.content_canvas.yview_scroll(1, "units")
+
+    def _bind_mousewheel(self, event=None):
+        for seq in MOUSEWHEEL_EVENTS:
+            self.content_canvas.bind_all(seq, self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event=None):
+        # Leave ยิงตอนเมาส์เข้า widget ลูกด้วย — ถอดเฉพาะเมื่อออกนอก canvas จริง
+        if event is not None:
+            inside = self.root.winfo_containing(event.x_root, event.y_root)
+            if inside is not None and str(inside).startswith(str(self.content_canvas)):
+                return
+        for seq in MOUSEWHEEL_EVENTS:
+            self.content_canvas.unbind_all(seq)
+
+    def _apply_resize(self):
+        """Scale UI ตามขนาด window ปัจจุบัน (ข้ามถ้าขนาดเท่าครั้งก่อน)"""
+        self._resize_after_id = None
+        # Update window size for scaling calculations
+        width = self.root.winfo_width()
+        height = self.root.winfo_height()
+        
+        # Prevent division by zero
+        if width <= 0 or height <= 0 or (width, height) == self._last_scaled_size:
+            return
+        # Scale UI elements if needed
+        if hasattr(self, 'main_frame') and hasattr(self, 'scalable_widgets'):
+            self._last_scaled_size = (width, height)
+            self.scale_ui(width, height)
     
     def scale_ui(self, width, height):
         """Scale UI elements based on window size"""
@@ -396,34 +735,63 @@ class HardwareControlGUI:
         scale = min(width_scale, height_scale, 1.5)  # Cap at 1.5x to prevent too large
         scale = max(scale, 0.7)  # Minimum 0.7x to prevent too small
         
-        # Scale fonts
-        if hasattr(self, 'scalable_widgets') and self.scalable_widgets:
-            for widget_type, widgets in self.scalable_widgets.items():
-                if not widgets:
-                    continue
-                    
-                base_font_size = self.base_fonts.get(widget_type, 10)
-                new_font_size = max(8, int(base_font_size * scale))  # Minimum 8px
-                
-                for widget in widgets:
-                    try:
-                        if widget and widget.winfo_exists():
-                            current_font = widget.cget('font')
-                            if isinstance(current_font, tuple):
-                                font_name = current_font[0] if len(current_font) > 0 else 'Helvetica'
-                                font_weight = current_font[2] if len(current_font) > 2 else 'normal'
-                                widget.configure(font=(font_name, new_font_size, font_weight))
-                            elif isinstance(current_font, str):
-                                # Parse font string if needed
-                                widget.configure(font=('Helvetica', new_font_size))
-                    except (tk.TclError, AttributeError, Exception):
-                        pass  # Skip if widget doesn't exist or doesn't support font change
-        
+        # Scale fonts — ปรับ named font ของกลุ่ม, widget ที่ใช้ font นั้นเปลี่ยนตามทั้งหมด
+        for widget_type, fonts in self.scalable_widgets.items():
+            base_font_size = self.base_fonts.get(widget_type, 10)
+            new_font_size = max(8, int(base_font_size * scale))  # Minimum 8px
+            # ขนาดเท่าที่ตั้งไว้แล้ว — ไม่ต้อง configure ซ้ำทั้งกลุ่ม
+            if self._applied_font_sizes.get(widget_type) == new_font_size:
+                continue
+            self._applied_font_sizes[widget_type] = new_font_size
+            for named_font in fonts.values():
+                named_font.configure(size=new_font_size)
+
+    def _register_scalable(self, widget_type, *widgets):
+        """เพิ่ม widget ให้ scale_ui ปรับ font ตามขนาด window
+
+        widget ในกลุ่มที่ font (family, size, weight) เดียวกันใช้ named font (tkfont.Font) ตัวเดียวกัน
+        scale_ui จึงเรียก configure ครั้งเดียวต่อ font ไม่ต้องวนทุก widget (ไม่มี cget/isinstance ตอน resize)
+        """
+        fonts = self.scalable_widgets.setdefault(widget_type, {})
+        for widget in widgets:
+            font = widget.cget('font')
+            if isinstance(font, str):
+                font = self.root.tk.splitlist(font)  # "Helvetica 12 bold" -> ('Helvetica', '12', 'bold')
+            font_name = font[0] if len(font) > 0 else FONT_FAMILY
+            font_size = int(font[1]) if len(font) > 1 else self.base_fonts.get(widget_type, 10)
+            font_weight = font[2] if len(font) > 2 else 'normal'
+            key = (font_name, font_size, font_weight)
+            named_font = fonts.get(key)
+            if named_font is None:
+                named_font = fonts[key] = tkfont.Font(root=self.root, font=key)
+            widget.configure(font=named_font)
+        # มี widget ใหม่ (ยังเป็นขนาด base) — ให้ scale ครั้งถัดไปปรับทั้งกลุ่มอีกรอบ
+        self._applied_font_sizes.pop(widget_type, None)
+        self._last_scaled_size = None
+
+    def _init_operation_styles(self):
+        """กำหนด ttk style ของ op frame: Op.<op_key>.TFrame (idle) และ Op.<State>.TFrame"""
+        style = ttk.Style(self.root)
+        for key, color in OPERATION_FRAME_COLORS.items():
+            style.configure(f'Op.{key}.TFrame', background=color)
+        for state, color in OPERATION_STATE_COLORS.items():
+            style.configure(f'Op.{state}.TFrame', background=color)
+
+    def _set_operation_style(self, op_key, state=None):
+        """สลับ style ของ op frame (state=None คือกลับเป็นสี idle ของ op นั้น)"""
+        frame = self.operation_frames.get(op_key)
+        if frame is not None:
+            self._cached_configure(frame, style=f'Op.{state or op_key}.TFrame')
+            if state:
+                self._styled_ops.add(op_key)
+            else:
+                self._styled_ops.discard(op_key)
+
     # ==================== MAIN LAYOUT ====================
     def create_main_layout(self):
         """สร้าง Layout หลัก"""
         # Main container
-        main_frame = tk.Frame(self.root, bg='#f0f0f0')
+        main_frame = tk.Frame(self.root, bg=BG_COLOR)
         main_frame.pack(fill='both', expand=True, padx=5, pady=2)
         self.main_frame = main_frame
         
@@ -432,11 +800,11 @@ class HardwareControlGUI:
         self.create_navigation_bar(main_frame)
         
         # Content area with Scrollbar
-        canvas_container = tk.Frame(main_frame, bg='#f0f0f0')
+        canvas_container = tk.Frame(main_frame, bg=BG_COLOR)
         canvas_container.pack(fill='both', expand=True)
         
         # Canvas สำหรับ scroll
-        self.content_canvas = tk.Canvas(canvas_container, bg='#f0f0f0', highlightthickness=0)
+        self.content_canvas = tk.Canvas(canvas_container, bg=BG_COLOR, highlightthickness=0)
         self.content_canvas.pack(side='left', fill='both', expand=True)
         
         # Vertical Scrollbar
@@ -445,41 +813,25 @@ class HardwareControlGUI:
         self.content_canvas.configure(yscrollcommand=v_scrollbar.set)
         
         # Content frame (ใส่ใน Canvas)
-        content_frame = tk.Frame(self.content_canvas, bg='#f0f0f0')
+        content_frame = tk.Frame(self.content_canvas, bg=BG_COLOR)
         self.content_canvas_window = self.content_canvas.create_window(0, 0, anchor='nw', window=content_frame)
         
-        def configure_scroll_region(event=None):
-            self.content_canvas.update_idletasks()
-            bbox = self.content_canvas.bbox('all')
-            if bbox:
-                self.content_canvas.configure(scrollregion=bbox)
+        content_frame.bind('<Configure>', self._schedule_scrollregion)
+        self.content_canvas.bind('<Configure>', self._schedule_canvas_width)
         
-        def configure_canvas_width(event=None):
-            canvas_width = self.content_canvas.winfo_width()
-            if canvas_width > 1:
-                self.content_canvas.itemconfig(self.content_canvas_window, width=canvas_width)
-        
-        content_frame.bind('<Configure>', configure_scroll_region)
-        self.content_canvas.bind('<Configure>', configure_canvas_width)
-        
-        def on_mousewheel(event):
-            if event.num == 4 or event.delta > 0:
-                self.content_canvas.yview_scroll(-1, "units")
-            elif event.num == 5 or event.delta < 0:
-                self.content_canvas.yview_scroll(1, "units")
-        
-        self.content_canvas.bind_all("<MouseWheel>", on_mousewheel)
-        self.content_canvas.bind_all("<Button-4>", on_mousewheel)
-        self.content_canvas.bind_all("<Button-5>", on_mousewheel)
+        # wheel ทำงานเฉพาะตอนเมาส์อยู่เหนือพื้นที่ scroll (bind_all ตอน Enter, ถอดตอน Leave)
+        # ไม่ bind ที่ canvas ตรงๆ เพราะ event ตอนชี้ widget ลูกไม่ผ่าน canvas
+        self.content_canvas.bind('<Enter>', self._bind_mousewheel)
+        self.content_canvas.bind('<Leave>', self._unbind_mousewheel)
         
         self.content_frame = content_frame
         
         # ==================== PAGE CONTAINER ====================
-        self.page_container = tk.Frame(content_frame, bg='#f0f0f0')
+        self.page_container = tk.Frame(content_frame, bg=BG_COLOR)
         self.page_container.pack(fill='both', expand=False, anchor='n')
         
         # --- Page 1: Control (single-column layout) ---
-        page_control = tk.Frame(self.page_container, bg='#f0f0f0')
+        page_control = tk.Frame(self.page_container, bg=BG_COLOR)
         self.pages["control"] = page_control
         
         self.create_mode_selection(page_control)
@@ -487,16 +839,19 @@ class HardwareControlGUI:
         self.create_manual_controls(page_control)
         
         # --- Page 2: Settings (Auto Mode Parameters) ---
-        page_settings = tk.Frame(self.page_container, bg='#f0f0f0')
+        page_settings = tk.Frame(self.page_container, bg=BG_COLOR)
         self.pages["settings"] = page_settings
         
-        self.create_auto_parameters(page_settings)
-        
         # --- Page 3: Display (Process Data) ---
-        page_display = tk.Frame(self.page_container, bg='#f0f0f0')
+        page_display = tk.Frame(self.page_container, bg=BG_COLOR)
         self.pages["display"] = page_display
-        
-        self.create_display_page(page_display)
+
+        # หน้า Settings/Display สร้างเนื้อหาเมื่อเปิดครั้งแรก (show_page)
+        self._page_builders = {
+            "settings": self.create_auto_parameters,
+            "display": self.create_display_page,
+        }
+        self._pages_built = {"control"}
 
         # แป้นตัวเลข — popup window (สร้างครั้งเดียว ใช้ซ้ำ)
         self.numpad_window = None
@@ -510,10 +865,10 @@ class HardwareControlGUI:
     
     # ==================== NAVIGATION BAR ====================
     def create_navigation_bar(self, parent):
-        nav_frame = tk.Frame(parent, bg='#2c3e50', pady=8)
+        nav_frame = tk.Frame(parent, bg=DARK_COLOR, pady=8)
         nav_frame.pack(side='bottom', fill='x')
         
-        btn_container = tk.Frame(nav_frame, bg='#2c3e50')
+        btn_container = tk.Frame(nav_frame, bg=DARK_COLOR)
         btn_container.pack(side='right', padx=15)
         
         pages_config = [
@@ -526,7 +881,7 @@ class HardwareControlGUI:
             btn = tk.Button(
                 btn_container,
                 text=label_text,
-                font=('Helvetica', 12, 'bold'),
+                font=FONT_12_BOLD,
                 bg='#4a4a4a',
                 fg='white',
                 activebackground='#666',
@@ -540,8 +895,25 @@ class HardwareControlGUI:
             self.nav_buttons[page_key] = (btn, active_color)
     
     # ==================== PAGE SWITCHING ====================
+    def _ensure_page_built(self, page_key):
+        """สร้างเนื้อหาของหน้าครั้งแรกที่ถูกเปิด — ครั้งต่อไปใช้ widget เดิม"""
+        if page_key in self._pages_built or page_key not in self._page_builders:
+            return
+        self._pages_built.add(page_key)
+        self._page_builders[page_key](self.pages[page_key])
+        if page_key == "settings":
+            if self.running and self._cs.op:
+                op = self._cs.op
+                self._set_operation_style(op, 'Break' if op == 'break_time' else 'Active')
+
+    def _update_cycle_label(self, cycle):
+        """อัพเดท Current Cycle บนหน้า Settings (ข้ามถ้าหน้ายังไม่ถูกสร้าง)"""
+        if hasattr(self, 'cycle_label'):
+            self.cycle_label.configure(text=f"Current Cycle: {cycle}")
+
     def show_page(self, page_key):
         """สลับไปหน้าที่เลือก"""
+        self._ensure_page_built(page_key)
         for key, frame in self.pages.items():
             frame.pack_forget()
         
@@ -558,6 +930,37 @@ class HardwareControlGUI:
             else:
                 btn.configure(bg='#4a4a4a', relief='flat')
 
+    # ==================== TOAST (แจ้งเตือนแบบไม่ modal) ====================
+    def _toast(self, message):
+        """แสดงข้อความมุมขวาบนของ window แล้วซ่อนเองหลัง TOAST_DURATION_MS (ไม่บล็อกเหมือน messagebox)"""
+        if self._toast_window is None:
+            win = tk.Toplevel(self.root)
+            win.overrideredirect(True)
+            win.withdraw()
+            self._toast_label = tk.Label(
+                win, font=FONT_11_BOLD,
+                bg=DARK_COLOR, fg='white', padx=14, pady=8
+            )
+            self._toast_label.pack()
+            self._toast_window = win
+        elif self._toast_after_id is not None:
+            self.root.after_cancel(self._toast_after_id)
+
+        win = self._toast_window
+        self._toast_label.configure(text=message)
+        win.update_idletasks()
+        x = self.root.winfo_rootx() + self.root.winfo_width() - win.winfo_reqwidth() - 10
+        y = self.root.winfo_rooty() + 10
+        win.geometry(f"+{max(0, x)}+{y}")
+        win.deiconify()
+        win.lift()
+        self._toast_after_id = self.root.after(TOAST_DURATION_MS, self._hide_toast)
+
+    def _hide_toast(self):
+        self._toast_after_id = None
+        if self._toast_window is not None:
+            self._toast_window.withdraw()
+
     # ==================== VIRTUAL NUMPAD (POPUP) ====================
     def _build_numpad_window(self):
         """สร้าง popup numpad (Toplevel) — เรียกครั้งเดียว แล้ว show/hide ทีหลัง"""
@@ -575,8 +978,8 @@ class HardwareControlGUI:
         header.pack(fill='x', pady=(0, 6))
         tk.Label(
             header, text="แป้นตัวเลข",
-            font=('Helvetica', 12, 'bold'),
-            bg='#ecf0f1', fg='#2c3e50'
+            font=FONT_12_BOLD,
+            bg='#ecf0f1', fg=DARK_COLOR
         ).pack(side='left')
 
         inner = tk.Frame(outer, bg='#ecf0f1')
@@ -586,13 +989,13 @@ class HardwareControlGUI:
             b = tk.Button(
                 inner,
                 text=text,
-                font=('Helvetica', 16, 'bold'),
+                font=FONT_16_BOLD,
                 width=5,
                 height=2,
                 cursor='hand2',
                 bg='#bdc3c7',
                 activebackground='#95a5a6',
-                fg='#2c3e50',
+                fg=DARK_COLOR,
                 command=cmd,
                 **extra
             )
@@ -613,7 +1016,7 @@ class HardwareControlGUI:
 
         tk.Button(
             outer, text='Enter',
-            font=('Helvetica', 12, 'bold'),
+            font=FONT_12_BOLD,
             bg='#27ae60', fg='white',
             activebackground='#1e8449',
             relief='raised', cursor='hand2',
@@ -771,27 +1174,27 @@ class HardwareControlGUI:
         mode_frame = tk.LabelFrame(
             parent, 
             text="Control Mode", 
-            font=('Helvetica', 15, 'bold'), 
-            bg='#f0f0f0',
-            fg='#2c3e50',  
+            font=FONT_15_BOLD, 
+            bg=BG_COLOR,
+            fg=DARK_COLOR,  
             padx=12,
             pady=8
         )
         mode_frame.pack(fill='x', pady=(0, 10))
         
         # Mode buttons: fixed size, centered in Control Mode
-        btn_container = tk.Frame(mode_frame, bg='#f0f0f0')
+        btn_container = tk.Frame(mode_frame, bg=BG_COLOR)
         btn_container.pack(fill='x')
-        btn_center = tk.Frame(btn_container, bg='#f0f0f0')
+        btn_center = tk.Frame(btn_container, bg=BG_COLOR)
         btn_center.pack(expand=True, anchor='center')
         btn_px_w, btn_px_h = 160, 44
-        manual_frame = tk.Frame(btn_center, width=btn_px_w, height=btn_px_h, bg='#f0f0f0')
+        manual_frame = tk.Frame(btn_center, width=btn_px_w, height=btn_px_h, bg=BG_COLOR)
         manual_frame.pack_propagate(0)
         manual_frame.pack(side='left', padx=(0, 8))
         self.manual_btn = tk.Button(
             manual_frame,
             text="Manual",
-            font=('Helvetica', 13, 'bold'),
+            font=FONT_13_BOLD,
             bg='#e67e22',
             fg='white',
             relief='raised',
@@ -799,13 +1202,13 @@ class HardwareControlGUI:
             command=lambda: self.set_mode("manual")
         )
         self.manual_btn.pack(fill='both', expand=True)
-        auto_frame = tk.Frame(btn_center, width=btn_px_w, height=btn_px_h, bg='#f0f0f0')
+        auto_frame = tk.Frame(btn_center, width=btn_px_w, height=btn_px_h, bg=BG_COLOR)
         auto_frame.pack_propagate(0)
         auto_frame.pack(side='left')
         self.auto_btn = tk.Button(
             auto_frame,
             text="Auto",
-            font=('Helvetica', 13, 'bold'),
+            font=FONT_13_BOLD,
             bg='#95a5a6',
             fg='white',
             relief='raised',
@@ -815,16 +1218,14 @@ class HardwareControlGUI:
         self.auto_btn.pack(fill='both', expand=True)
         
         # Store for scaling
-        if 'button' not in self.scalable_widgets:
-            self.scalable_widgets['button'] = []
-        self.scalable_widgets['button'].extend([self.manual_btn, self.auto_btn])
+        self._register_scalable('button', self.manual_btn, self.auto_btn)
         
         # Mode description
         self.mode_desc = tk.Label(
             mode_frame,
             text="กดปุ่มเพื่อควบคุม hardware",
-            font=('Helvetica', 11),
-            bg='#f0f0f0',
+            font=FONT_11,
+            bg=BG_COLOR,
             fg='#7f8c8d'
         )
         self.mode_desc.pack(pady=(8, 0))
@@ -832,7 +1233,7 @@ class HardwareControlGUI:
     def set_mode(self, mode):
         """เปลี่ยนโหมดการทำงาน"""
         if self.running:
-            messagebox.showwarning("Warning", "กรุณาหยุดการทำงานก่อนเปลี่ยนโหมด")
+            self._toast("กรุณาหยุดการทำงานก่อนเปลี่ยนโหมด")
             return
             
         self.current_mode.set(mode)
@@ -862,36 +1263,24 @@ class HardwareControlGUI:
         self.manual_frame = tk.LabelFrame(
             parent,
             text="Hardware Controls",
-            font=('Helvetica', 15, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_15_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=16,
             pady=12
         )
         
-        left_devices = [
-            ('Value 1', 's_valve1'),
-            ('Value 2', 's_valve2'),
-            ('Value 3', 's_valve3'),
-            ('Value 4', 's_valve4'),
-        ]
-        right_devices = [
-            ('Pump', 'pump'),
-            ('Fan', 'fan'),
-            ('Heater', 'heater'),
-        ]
-        
         self.switch_indicators = {}
         self.device_display_names = {}
         self.device_states = {}
-        for label_text, dk in left_devices + right_devices:
+        for label_text, dk in MANUAL_DEVICES:
             self.device_display_names[dk] = label_text
             self.device_states[dk] = False
         
-        self.device_names = {dk: label for label, dk in left_devices + right_devices}
+        self.device_names = {dk: label for label, dk in MANUAL_DEVICES}
         
         # --- Timer row ---
-        timer_row = tk.Frame(self.manual_frame, bg='#f0f0f0')
+        timer_row = tk.Frame(self.manual_frame, bg=BG_COLOR)
         timer_row.pack(fill='x', pady=(0, 8))
 
         self.manual_timer_enabled = tk.BooleanVar(value=False)
@@ -899,9 +1288,9 @@ class HardwareControlGUI:
             timer_row,
             text="Use Timer",
             variable=self.manual_timer_enabled,
-            font=('Helvetica', 12),
-            bg='#f0f0f0',
-            activebackground='#f0f0f0',
+            font=FONT_12,
+            bg=BG_COLOR,
+            activebackground=BG_COLOR,
             command=self._on_manual_timer_toggle
         ).pack(side='left')
 
@@ -909,7 +1298,7 @@ class HardwareControlGUI:
         self.manual_timer_entry = tk.Entry(
             timer_row,
             textvariable=self.manual_timer_duration,
-            font=('Helvetica', 12),
+            font=FONT_12,
             width=8,
             justify='center',
             state='disabled'
@@ -921,17 +1310,17 @@ class HardwareControlGUI:
         tk.Label(
             timer_row,
             text="(ss)",
-            font=('Helvetica', 10),
-            bg='#f0f0f0',
+            font=FONT_10,
+            bg=BG_COLOR,
             fg='#7f8c8d'
         ).pack(side='left')
 
         self.manual_timer_remaining_label = tk.Label(
             timer_row,
             text="",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50'
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR
         )
         self.manual_timer_remaining_label.pack(side='right')
 
@@ -939,67 +1328,69 @@ class HardwareControlGUI:
         pad_between = 14
         box_pady = 8
         
-        two_cols = tk.Frame(self.manual_frame, bg='#f0f0f0')
+        two_cols = tk.Frame(self.manual_frame, bg=BG_COLOR)
         two_cols.pack(fill='x', pady=8)
         
-        left_col = tk.Frame(two_cols, bg='#f0f0f0')
-        left_col.pack(side='left', expand=True, fill='both', padx=(0, pad_between))
-        for label_text, device_key in left_devices:
-            c = tk.Canvas(left_col, width=self.box_w, height=self.box_h, bg='#f0f0f0', highlightthickness=0)
-            c.pack(pady=box_pady)
-            c.bind('<Button-1>', lambda e, k=device_key: self.toggle_device(k))
-            c.bind('<Enter>', lambda e, c=c: c.configure(cursor='hand2'))
-            self.switch_indicators[device_key] = c
-            self._draw_device_box(c, label_text, False)
-        
-        right_col = tk.Frame(two_cols, bg='#f0f0f0')
-        right_col.pack(side='left', expand=True, fill='both', padx=(pad_between, 0))
-        for label_text, device_key in right_devices:
-            c = tk.Canvas(right_col, width=self.box_w, height=self.box_h, bg='#f0f0f0', highlightthickness=0)
-            c.pack(pady=box_pady)
-            c.bind('<Button-1>', lambda e, k=device_key: self.toggle_device(k))
-            c.bind('<Enter>', lambda e, c=c: c.configure(cursor='hand2'))
-            self.switch_indicators[device_key] = c
-            self._draw_device_box(c, label_text, False)
+        # คอลัมน์ซ้าย/ขวาสร้างเหมือนกัน ต่างแค่ padding กับรายการอุปกรณ์
+        columns = (
+            ((0, pad_between), MANUAL_DEVICES_LEFT),
+            ((pad_between, 0), MANUAL_DEVICES_RIGHT),
+        )
+        for padx, devices in columns:
+            col = tk.Frame(two_cols, bg=BG_COLOR)
+            col.pack(side='left', expand=True, fill='both', padx=padx)
+            for label_text, device_key in devices:
+                c = tk.Canvas(col, width=self.box_w, height=self.box_h, bg=BG_COLOR, highlightthickness=0)
+                c.pack(pady=box_pady)
+                c.bind('<Button-1>', lambda e, k=device_key: self.toggle_device(k))
+                c.bind('<Enter>', lambda e, c=c: c.configure(cursor='hand2'))
+                self.switch_indicators[device_key] = c
+                self._draw_device_box(c, label_text, False)
         
         self.name_labels = {}
 
     def _draw_device_box(self, canvas, text, is_on):
-        """Draw rounded-rectangle box: light grey or green, black outline."""
+        """Draw rounded-rectangle box: light grey or green, black outline.
+
+        วาดครั้งเดียวตอนสร้าง — item ที่เปลี่ยนสีติด tag 'corner'/'body'/'label'
+        ให้ _set_device_box_state สลับ ON/OFF ด้วย itemconfigure (ไม่ลบ/สร้างใหม่)
+        """
         canvas.delete('all')
         w = getattr(self, 'box_w', 170)
         h = getattr(self, 'box_h', 52)
         r = min(10, w // 16, (h - 2) // 2)
-        fill = '#27ae60' if is_on else '#e0e0e0'
+        fill = DEVICE_BOX_COLORS[is_on][0]
         outline = '#1a1a1a'
-        canvas.create_arc(0, 0, 2*r, 2*r, start=90, extent=90, fill=fill, outline=outline, width=1)
-        canvas.create_arc(w-2*r, 0, w, 2*r, start=0, extent=90, fill=fill, outline=outline, width=1)
-        canvas.create_arc(w-2*r, h-2*r, w, h, start=270, extent=90, fill=fill, outline=outline, width=1)
-        canvas.create_arc(0, h-2*r, 2*r, h, start=180, extent=90, fill=fill, outline=outline, width=1)
-        canvas.create_rectangle(r, 0, w-r, h, fill=fill, outline=fill)
-        canvas.create_rectangle(0, r, w, h-r, fill=fill, outline=fill)
+        canvas.create_arc(0, 0, 2*r, 2*r, start=90, extent=90, fill=fill, outline=outline, width=1, tags='corner')
+        canvas.create_arc(w-2*r, 0, w, 2*r, start=0, extent=90, fill=fill, outline=outline, width=1, tags='corner')
+        canvas.create_arc(w-2*r, h-2*r, w, h, start=270, extent=90, fill=fill, outline=outline, width=1, tags='corner')
+        canvas.create_arc(0, h-2*r, 2*r, h, start=180, extent=90, fill=fill, outline=outline, width=1, tags='corner')
+        canvas.create_rectangle(r, 0, w-r, h, fill=fill, outline=fill, tags='body')
+        canvas.create_rectangle(0, r, w, h-r, fill=fill, outline=fill, tags='body')
         canvas.create_line(r, 0, w-r, 0, fill=outline, width=1)
         canvas.create_line(r, h, w-r, h, fill=outline, width=1)
         canvas.create_line(0, r, 0, h-r, fill=outline, width=1)
         canvas.create_line(w, r, w, h-r, fill=outline, width=1)
-        canvas.create_text(w//2, h//2, text=text, font=('Helvetica', 12, 'bold'),
-                          fill='#1a1a1a' if is_on else '#2c3e50')
+        canvas.create_text(w//2, h//2, text=text, font=FONT_12_BOLD,
+                          fill=DEVICE_BOX_COLORS[is_on][1], tags='label')
 
-    def draw_toggle_switch(self, canvas, is_on):
-        """Legacy: now each device is a box; redraw using device_display_names."""
-        pass
+    @staticmethod
+    def _set_device_box_state(canvas, is_on):
+        """สลับสีกล่องที่วาดไว้แล้วเป็น ON/OFF (3 itemconfigure แทนการวาดใหม่ 11 item)"""
+        fill, text_fill = DEVICE_BOX_COLORS[is_on]
+        canvas.itemconfigure('corner', fill=fill)
+        canvas.itemconfigure('body', fill=fill, outline=fill)
+        canvas.itemconfigure('label', fill=text_fill)
 
     def update_switch_button(self, device_key, is_on):
         """Update device box to match ON/OFF state."""
         self.device_states[device_key] = is_on
-        c = self.switch_indicators[device_key]
-        text = self.device_display_names.get(device_key, device_key)
-        self._draw_device_box(c, text, is_on)
+        self._set_device_box_state(self.switch_indicators[device_key], is_on)
     
     # ==================== OPERATION SEQUENCE & METHANE ====================
     def create_operation_sequence(self, parent):
         """สร้างแถว Operation Sequence (ซ้าย) + Methane ppm (ขวา) สูงเท่ากัน"""
-        ops_row = tk.Frame(parent, bg='#f0f0f0')
+        ops_row = tk.Frame(parent, bg=BG_COLOR)
         ops_row.pack(fill='x', pady=(0, 6))
         ops_row.columnconfigure(0, weight=3, uniform='ops_cols')
         ops_row.columnconfigure(1, weight=2, uniform='ops_cols')
@@ -1008,9 +1399,9 @@ class HardwareControlGUI:
         seq_frame = tk.LabelFrame(
             ops_row,
             text="Operation Sequence",
-            font=('Helvetica', 15, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_15_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8
         )
@@ -1020,32 +1411,32 @@ class HardwareControlGUI:
         tk.Label(
             seq_frame,
             text=flow_text,
-            font=('Helvetica', 9),
-            bg='#f0f0f0',
+            font=FONT_9,
+            bg=BG_COLOR,
             fg='#7f8c8d'
         ).pack(pady=(3, 0))
 
         self.progress_label = tk.Label(
             seq_frame,
             text="Ready to start",
-            font=('Helvetica', 11, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_11_BOLD,
+            bg=BG_COLOR,
             fg='#27ae60'
         )
         self.progress_label.pack(pady=(5, 0))
 
+        self.timer_var = tk.StringVar(value="--:--")
         self.timer_label = tk.Label(
             seq_frame,
-            text="--:--",
-            font=('Helvetica', 24, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50'
+            textvariable=self.timer_var,
+            font=FONT_24_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR
         )
         self.timer_label.pack(pady=5)
+        self._label_vars[str(self.timer_label)] = self.timer_var
 
-        if 'timer' not in self.scalable_widgets:
-            self.scalable_widgets['timer'] = []
-        self.scalable_widgets['timer'].append(self.timer_label)
+        self._register_scalable('timer', self.timer_label)
 
         self.create_action_buttons(seq_frame)
         self.create_methane_display(ops_row)
@@ -1055,22 +1446,22 @@ class HardwareControlGUI:
         methane_frame = tk.LabelFrame(
             parent,
             text="Methane",
-            font=('Helvetica', 15, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_15_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8
         )
         methane_frame.grid(row=0, column=1, sticky='nsew')
 
-        methane_inner = tk.Frame(methane_frame, bg='#f0f0f0')
+        methane_inner = tk.Frame(methane_frame, bg=BG_COLOR)
         methane_inner.pack(fill='both', expand=True)
 
         self.methane_value_label = tk.Label(
             methane_inner,
             text="----",
-            font=('Helvetica', 32, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_32_BOLD,
+            bg=BG_COLOR,
             fg='#e67e22'
         )
         self.methane_value_label.pack(expand=True)
@@ -1078,15 +1469,13 @@ class HardwareControlGUI:
         self.methane_unit_label = tk.Label(
             methane_inner,
             text="ppm",
-            font=('Helvetica', 14, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_14_BOLD,
+            bg=BG_COLOR,
             fg='#e67e22'
         )
         self.methane_unit_label.pack(pady=(0, 8))
 
-        if 'methane' not in self.scalable_widgets:
-            self.scalable_widgets['methane'] = []
-        self.scalable_widgets['methane'].append(self.methane_value_label)
+        self._register_scalable('methane', self.methane_value_label)
 
     def _set_methane_ppm_readout(self, value_text: str):
         """อัปเดตตัวเลข methane (ppm) ทั้งหน้า Control และหน้า Display (ถ้ามี)"""
@@ -1105,24 +1494,24 @@ class HardwareControlGUI:
         mf = tk.LabelFrame(
             parent,
             text="Methane (ppm)",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8,
         )
         mf.pack(fill='x', padx=20, pady=(0, 8))
 
-        inner = tk.Frame(mf, bg='#f0f0f0')
+        inner = tk.Frame(mf, bg=BG_COLOR)
         inner.pack(fill='x', pady=4)
-        row = tk.Frame(inner, bg='#f0f0f0')
+        row = tk.Frame(inner, bg=BG_COLOR)
         row.pack(anchor='center')
 
         self.display_methane_value_label = tk.Label(
             row,
             text="----",
-            font=('Helvetica', 28, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_28_BOLD,
+            bg=BG_COLOR,
             fg='#e67e22',
         )
         self.display_methane_value_label.pack(side='left', padx=(0, 8))
@@ -1130,15 +1519,13 @@ class HardwareControlGUI:
         self.display_methane_unit_label = tk.Label(
             row,
             text="ppm",
-            font=('Helvetica', 14, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_14_BOLD,
+            bg=BG_COLOR,
             fg='#e67e22',
         )
         self.display_methane_unit_label.pack(side='left')
 
-        if 'methane' not in self.scalable_widgets:
-            self.scalable_widgets['methane'] = []
-        self.scalable_widgets['methane'].append(self.display_methane_value_label)
+        self._register_scalable('methane', self.display_methane_value_label)
 
     # ==================== AUTO PARAMETERS ====================
     def create_auto_parameters(self, parent):
@@ -1147,26 +1534,26 @@ class HardwareControlGUI:
         title = tk.Label(
             parent,
             text="Auto Mode Parameters",
-            font=('Helvetica', 16, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_16_BOLD,
+            bg=BG_COLOR,
             fg='#9b59b6'
         )
         title.pack(pady=(0, 5), anchor='w')
         
         # Settings page (single column)
-        settings_cols = tk.Frame(parent, bg='#f0f0f0')
+        settings_cols = tk.Frame(parent, bg=BG_COLOR)
         settings_cols.pack(fill='both', expand=False, anchor='n')
         
-        settings_left = tk.Frame(settings_cols, bg='#f0f0f0')
+        settings_left = tk.Frame(settings_cols, bg=BG_COLOR)
         settings_left.pack(fill='both', expand=True)
 
         # Parameter source selection
         source_frame = tk.LabelFrame(
             settings_left,
             text="Parameter Source",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8
         )
@@ -1175,7 +1562,7 @@ class HardwareControlGUI:
         self.param_source = tk.StringVar(value="ui")
         
         # Row: box-style buttons (no radio circle, full rectangle)
-        source_row = tk.Frame(source_frame, bg='#f0f0f0')
+        source_row = tk.Frame(source_frame, bg=BG_COLOR)
         source_row.pack(fill='x', pady=4)
         
         rb_ui = tk.Radiobutton(
@@ -1183,13 +1570,13 @@ class HardwareControlGUI:
             text="  Input from UI  ",
             variable=self.param_source,
             value="ui",
-            font=('Helvetica', 12, 'bold'),
+            font=FONT_12_BOLD,
             indicatoron=False,
             bg='#e0e0e0',
             selectcolor='#3498db',
             activebackground='#d0d0d0',
             activeforeground='#1a1a1a',
-            fg='#2c3e50',
+            fg=DARK_COLOR,
             padx=24,
             pady=14,
             bd=2,
@@ -1204,13 +1591,13 @@ class HardwareControlGUI:
             text="  Load from config.json  ",
             variable=self.param_source,
             value="config",
-            font=('Helvetica', 12, 'bold'),
+            font=FONT_12_BOLD,
             indicatoron=False,
             bg='#e0e0e0',
             selectcolor='#3498db',
             activebackground='#d0d0d0',
             activeforeground='#1a1a1a',
-            fg='#2c3e50',
+            fg=DARK_COLOR,
             padx=24,
             pady=14,
             bd=2,
@@ -1227,29 +1614,17 @@ class HardwareControlGUI:
         ops_frame = tk.LabelFrame(
             settings_left,
             text="Operation Duration (seconds)",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8
         )
         ops_frame.pack(fill='x', pady=(0, 10))
         
-        operations = [
-            ("Heating (30m)", 'heating', '#fff59d', "Heater ON"),
-            ("Baseline (30s)", 'baseline', '#81d4fa', "SV1+SV3+Pump"),
-            ("Vacuum (10s)", 'vacuum', '#b39ddb', "SV3+Pump"),
-            ("Mix Air (10s)", 'mix_air', '#a5d6a7', "Fan ON"),
-            ("Measure (60s)", 'measure', '#ffcc80', "SV2+Pump [Data]"),
-            ("Vac Return (10s)", 'vacuum_return', '#f48fb1', "Pump+SV4 [Process]"),
-            ("Recovery (60s)", 'recovery', '#80cbc4', "SV1+SV3+Pump")
-        ]
-        
-        self.operation_entries = {}
-        self.operation_frames = {}
-        
-        for label_text, key, color, desc in operations:
-            frame = tk.Frame(ops_frame, bg=color, padx=8, pady=6)
+        for label_text, key, desc in OPERATION_PARAMETER_ROWS:
+            color = OPERATION_FRAME_COLORS[key]
+            frame = ttk.Frame(ops_frame, style=f'Op.{key}.TFrame', padding=(8, 6))
             frame.pack(fill='x', pady=4)
             self.operation_frames[key] = frame
             
@@ -1257,9 +1632,9 @@ class HardwareControlGUI:
             label = tk.Label(
                 frame,
                 text=label_text,
-                font=('Helvetica', 11, 'bold'),
+                font=FONT_11_BOLD,
                 bg=color,
-                fg='#2c3e50',
+                fg=DARK_COLOR,
                 width=18,
                 anchor='w'
             )
@@ -1269,7 +1644,7 @@ class HardwareControlGUI:
             desc_label = tk.Label(
                 frame,
                 text=desc,
-                font=('Helvetica', 10),
+                font=FONT_10,
                 bg=color,
                 fg='#555'
             )
@@ -1279,7 +1654,7 @@ class HardwareControlGUI:
             entry = tk.Entry(
                 frame,
                 textvariable=self.operation_durations[key],
-                font=('Helvetica', 12),
+                font=FONT_12,
                 width=8,
                 justify='center'
             )
@@ -1288,28 +1663,28 @@ class HardwareControlGUI:
             self._register_numpad_entry(entry, mode='int')
             
             # Seconds label
-            tk.Label(frame, text="sec", font=('Helvetica', 11), bg=color).pack(side='right')
+            tk.Label(frame, text="sec", font=FONT_11, bg=color).pack(side='right')
         
         # Break Time Section (below Operation Duration)
         break_frame = tk.LabelFrame(
             settings_left,
             text="Break Time",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
             fg='#e74c3c',
             padx=12,
             pady=8
         )
         break_frame.pack(fill='x', pady=(0, 10))
         
-        break_inner = tk.Frame(break_frame, bg='#ffcdd2', padx=8, pady=6)
+        break_inner = ttk.Frame(break_frame, style='Op.break_time.TFrame', padding=(8, 6))
         break_inner.pack(fill='x')
         self.operation_frames['break_time'] = break_inner
         
         tk.Label(
             break_inner,
             text="Break",
-            font=('Helvetica', 11, 'bold'),
+            font=FONT_11_BOLD,
             bg='#ffcdd2',
             fg='#c62828',
             width=18,
@@ -1319,7 +1694,7 @@ class HardwareControlGUI:
         break_entry = tk.Entry(
             break_inner,
             textvariable=self.operation_durations['break_time'],
-            font=('Helvetica', 12),
+            font=FONT_12,
             width=8,
             justify='center'
         )
@@ -1327,15 +1702,15 @@ class HardwareControlGUI:
         self.operation_entries['break_time'] = break_entry
         self._register_numpad_entry(break_entry, mode='int')
         
-        tk.Label(break_inner, text="sec", font=('Helvetica', 11), bg='#ffcdd2').pack(side='right')
+        tk.Label(break_inner, text="sec", font=FONT_11, bg='#ffcdd2').pack(side='right')
         
         # Cloud upload — ด้านล่าง Break Time (หน้า Settings)
         cloud_frame = tk.LabelFrame(
             settings_left,
             text="Cloud Upload",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8,
         )
@@ -1352,9 +1727,9 @@ class HardwareControlGUI:
             cloud_frame,
             text="Auto-upload to Cloud",
             variable=self.cloud_upload_enabled,
-            font=('Helvetica', 12),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_12,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             command=self._on_cloud_upload_toggle,
             state='normal' if CLOUD_CONFIG_AVAILABLE else 'disabled',
             cursor='hand2',
@@ -1363,24 +1738,21 @@ class HardwareControlGUI:
         self.cloud_status_label = tk.Label(
             cloud_frame,
             text="Cloud: —",
-            font=('Helvetica', 10),
-            bg='#f0f0f0',
+            font=FONT_10,
+            bg=BG_COLOR,
             fg='#7f8c8d',
         )
         self.cloud_status_label.pack(anchor='w')
 
-        if 'status' not in self.scalable_widgets:
-            self.scalable_widgets['status'] = []
-        self.scalable_widgets['status'].append(self.cloud_status_label)
-        self.scalable_widgets['status'].append(self.cloud_upload_checkbox)
+        self._register_scalable('status', self.cloud_status_label, self.cloud_upload_checkbox)
 
         # Loop Settings (below Cloud Upload)
         loop_frame = tk.LabelFrame(
             settings_left,
             text="Loop Settings",
-            font=('Helvetica', 12, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50',
+            font=FONT_12_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR,
             padx=12,
             pady=8
         )
@@ -1391,27 +1763,27 @@ class HardwareControlGUI:
             loop_frame,
             text="Infinite Loop",
             variable=self.infinite_loop,
-            font=('Helvetica', 12),
-            bg='#f0f0f0',
+            font=FONT_12,
+            bg=BG_COLOR,
             command=self.toggle_loop_settings
         )
         inf_check.pack(anchor='w', pady=5)
         
         # Loop count
-        loop_count_frame = tk.Frame(loop_frame, bg='#f0f0f0')
+        loop_count_frame = tk.Frame(loop_frame, bg=BG_COLOR)
         loop_count_frame.pack(fill='x', pady=5)
         
         tk.Label(
             loop_count_frame,
             text="Cycles:",
-            font=('Helvetica', 12),
-            bg='#f0f0f0'
+            font=FONT_12,
+            bg=BG_COLOR
         ).pack(side='left')
         
         self.loop_count_entry = tk.Entry(
             loop_count_frame,
             textvariable=self.loop_count,
-            font=('Helvetica', 12),
+            font=FONT_12,
             width=8,
             justify='center',
             state='disabled'
@@ -1422,17 +1794,17 @@ class HardwareControlGUI:
         tk.Label(
             loop_count_frame,
             text="(0 = infinite)",
-            font=('Helvetica', 10),
-            bg='#f0f0f0',
+            font=FONT_10,
+            bg=BG_COLOR,
             fg='#7f8c8d'
         ).pack(side='left')
         
         # Cycle counter display
         self.cycle_label = tk.Label(
             loop_frame,
-            text="Current Cycle: 0",
-            font=('Helvetica', 14, 'bold'),
-            bg='#f0f0f0',
+            text=f"Current Cycle: {self.current_cycle}",
+            font=FONT_14_BOLD,
+            bg=BG_COLOR,
             fg='#9b59b6'
         )
         self.cycle_label.pack(pady=8)
@@ -1441,7 +1813,7 @@ class HardwareControlGUI:
         save_btn = tk.Button(
             settings_left,
             text="Save Config",
-            font=('Helvetica', 13, 'bold'),
+            font=FONT_13_BOLD,
             bg='#3498db',
             fg='white',
             height=2,
@@ -1466,28 +1838,22 @@ class HardwareControlGUI:
             rb_config.configure(relief='sunken' if src == 'config' else 'raised')
         if src == "config":
             # Load from config file
-            config = load_config()
+            config = load_config(copy_result=False)
             op_times = config.get("operation_times", DEFAULT_CONFIG["operation_times"])
             auto_settings = config.get("auto_settings", DEFAULT_CONFIG["auto_settings"])
+            auto_defaults = DEFAULT_CONFIG["auto_settings"]
             
-            # Default values for each operation
-            defaults = {
-                'heating': 1800,
-                'baseline': 30,
-                'vacuum': 10,
-                'mix_air': 10,
-                'measure': 60,
-                'vacuum_return': 10,
-                'recovery': 60,
-                'break_time': 1620
-            }
+            op_times_get = op_times.get
+            entries = self.operation_entries
             for key, var in self.operation_durations.items():
-                default_val = defaults.get(key, 60)
-                var.set(str(op_times.get(key, default_val)))
-                self.operation_entries[key].configure(state='disabled')
+                text = str(op_times_get(key, OPERATION_DEFAULTS[key]))
+                # set เฉพาะค่าที่ต่าง — set ค่าเดิมก็ยิง trace ให้ cycle plan คำนวณใหม่
+                if var.get() != text:
+                    var.set(text)
+                entries[key].configure(state='disabled')
             
-            self.loop_count.set(str(auto_settings.get("loop_count", 0)))
-            self.infinite_loop.set(auto_settings.get("infinite_loop", True))
+            self.loop_count.set(str(auto_settings.get("loop_count", auto_defaults["loop_count"])))
+            self.infinite_loop.set(auto_settings.get("infinite_loop", auto_defaults["infinite_loop"]))
             self.loop_count_entry.configure(state='disabled')
         else:
             # Enable UI input
@@ -1513,14 +1879,14 @@ class HardwareControlGUI:
     # ==================== DISPLAY PAGE (Process Data Graph) ====================
     def create_display_page(self, parent):
         """Create display page with Process Data graph in the center."""
-        parent.configure(bg='#f0f0f0')
+        parent.configure(bg=BG_COLOR)
         
         title_label = tk.Label(
             parent,
             text="Display (Process Data)",
-            font=('Helvetica', 14, 'bold'),
-            bg='#f0f0f0',
-            fg='#2c3e50'
+            font=FONT_14_BOLD,
+            bg=BG_COLOR,
+            fg=DARK_COLOR
         )
         title_label.pack(pady=(10, 6))
         
@@ -1543,7 +1909,7 @@ class HardwareControlGUI:
             tk.Label(
                 graph_frame,
                 text=msg,
-                font=('Helvetica', 11),
+                font=FONT_11,
                 bg='#ffffff',
                 fg='#7f8c8d'
             ).pack(expand=True)
@@ -1553,12 +1919,12 @@ class HardwareControlGUI:
 
         if MATPLOTLIB_AVAILABLE and PANDAS_AVAILABLE:
             self.display_legend_frame.pack(fill='x', pady=(0, 4))
-            btn_frame = tk.Frame(parent, bg='#f0f0f0')
+            btn_frame = tk.Frame(parent, bg=BG_COLOR)
             btn_frame.pack(pady=(0, 10))
             refresh_btn = tk.Button(
                 btn_frame,
                 text="Refresh Graph",
-                font=('Helvetica', 10),
+                font=FONT_10,
                 bg='#3498db',
                 fg='white',
                 command=self._plot_process_data
@@ -1582,7 +1948,7 @@ class HardwareControlGUI:
             return
         if not hasattr(self, 'display_figure') or not hasattr(self, 'display_canvas'):
             return
-        self.root.after(0, self._plot_process_data)
+        self._run_on_ui_thread(self._plot_process_data)
     
     def _plot_process_data(self):
         """Load latest Process Data file and plot (thread-safe when called via root.after)."""
@@ -1600,7 +1966,7 @@ class HardwareControlGUI:
             return
         latest = max(csv_files, key=os.path.getmtime)
         try:
-            df = pd.read_csv(latest)
+            df = self._load_processed_csv(latest)
         except Exception as e:
             self._draw_placeholder_graph(f"Failed to read file: {e}")
             return
@@ -1616,40 +1982,58 @@ class HardwareControlGUI:
                     return f'sensor_{i+1}'
             return col_base
         
+        # กำหนดสีเองจาก prop_cycle (เป็น hex อยู่แล้ว) — legend ไม่ต้องแปลงสีทีละเส้น
+        colors = matplotlib.rcParams['axes.prop_cycle'].by_key()['color']
         self.display_figure.clear()
         ax = self.display_figure.add_subplot(111)
-        lines = []
-        for col in plot_cols:
+        # ดึงเป็น ndarray ก้อนเดียว (คอลัมน์ 0 = เวลา) แล้ว slice ต่อเส้น
+        arr = df[[time_col] + plot_cols].to_numpy(copy=False)
+        t = arr[:, 0]
+        legend_items = []
+        for i, col in enumerate(plot_cols, start=1):
             col_base = col.replace('_lp_ma', '')
             lbl = _channel_to_sensor_name(col_base)
-            line, = ax.plot(df[time_col].values, df[col].values, label=lbl, alpha=0.8)
-            lines.append(line)
+            color = colors[(i - 1) % len(colors)]
+            ax.plot(t, arr[:, i], label=lbl, color=color, alpha=0.8)
+            legend_items.append((lbl, color))
         ax.set_xlabel('Time (s)', fontsize=10)
         ax.set_ylabel('Voltage (V)', fontsize=10)
         ax.set_title(f'ADC Process Data - {latest.name}', fontsize=11)
         ax.grid(True, alpha=0.3)
         self.display_figure.tight_layout()
-        self._update_display_legend(lines)
+        self._update_display_legend(legend_items)
         self.display_canvas.draw()
     
-    def _update_display_legend(self, lines):
-        """Fill the legend frame below the graph with color patch + label for each line."""
-        if not getattr(self, 'display_legend_frame', None) or not lines or to_hex is None:
+    def _load_processed_csv(self, csv_path):
+        """โหลด CSV ผ่าน memo ในหน่วยความจำ (DataFrame ล่าสุด) — ไม่ตรง key ค่อย pd.read_csv
+
+        key = (ชื่อไฟล์, mtime_ns, hash ของ header) — header เปลี่ยน = schema เปลี่ยน
+        """
+        with open(csv_path, 'rb') as f:
+            header_hash = zlib.crc32(f.readline())
+        key = (csv_path.name, csv_path.stat().st_mtime_ns, header_hash)
+
+        cached = getattr(self, '_display_df_cache', None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        df = pd.read_csv(csv_path)
+        self._display_df_cache = (key, df)
+        return df
+
+    def _update_display_legend(self, legend_items):
+        """Fill the legend frame below the graph with color patch + label for each (label, hex color)."""
+        if not getattr(self, 'display_legend_frame', None) or not legend_items:
             return
         for w in self.display_legend_frame.winfo_children():
             w.destroy()
-        for line in lines:
-            try:
-                color = to_hex(line.get_color())
-            except Exception:
-                color = '#333333'
-            label_text = line.get_label()
+        for label_text, color in legend_items:
             row = tk.Frame(self.display_legend_frame, bg='#f5f5f5')
             row.pack(side='left', padx=(0, 16), pady=2)
             patch = tk.Frame(row, width=14, height=14, bg=color, relief='solid', bd=1)
             patch.pack(side='left', padx=(0, 6))
             patch.pack_propagate(0)
-            tk.Label(row, text=label_text, font=('Helvetica', 9), bg='#f5f5f5', fg='#2c3e50').pack(side='left')
+            tk.Label(row, text=label_text, font=FONT_9, bg='#f5f5f5', fg=DARK_COLOR).pack(side='left')
 
     def _draw_placeholder_graph(self, message):
         """Draw placeholder when no data or error."""
@@ -1667,21 +2051,21 @@ class HardwareControlGUI:
     # ==================== ACTION BUTTONS ====================
     def create_action_buttons(self, parent):
         """สร้างปุ่ม Start/Stop — กว้าง/สูงเท่ากัน (grid + uniform columns)"""
-        btn_frame = tk.Frame(parent, bg='#f0f0f0')
+        btn_frame = tk.Frame(parent, bg=BG_COLOR)
         btn_frame.pack(fill='x', pady=8)
         btn_frame.columnconfigure(0, weight=1, uniform='action_btn')
         btn_frame.columnconfigure(1, weight=1, uniform='action_btn')
 
-        stop_cell = tk.Frame(btn_frame, bg='#f0f0f0')
+        stop_cell = tk.Frame(btn_frame, bg=BG_COLOR)
         stop_cell.grid(row=0, column=0, sticky='nsew', padx=(0, 4))
-        start_cell = tk.Frame(btn_frame, bg='#f0f0f0')
+        start_cell = tk.Frame(btn_frame, bg=BG_COLOR)
         start_cell.grid(row=0, column=1, sticky='nsew', padx=(4, 0))
 
         action_btn_height = 2
         self.stop_btn = tk.Button(
             stop_cell,
             text="Stop",
-            font=('Helvetica', 11, 'bold'),
+            font=FONT_11_BOLD,
             bg='#e74c3c',
             fg='white',
             height=action_btn_height,
@@ -1692,7 +2076,7 @@ class HardwareControlGUI:
         self.start_btn = tk.Button(
             start_cell,
             text="Start Collection",
-            font=('Helvetica', 11, 'bold'),
+            font=FONT_11_BOLD,
             bg='#95a5a6',
             fg='white',
             height=action_btn_height,
@@ -1702,17 +2086,31 @@ class HardwareControlGUI:
         )
         self.start_btn.pack(fill='both', expand=True)
         
-        status_frame = tk.Frame(parent, bg='#f0f0f0')
+        status_frame = tk.Frame(parent, bg=BG_COLOR)
         status_frame.pack(fill='x', pady=5)
         
+        # status กับตัวเลข countdown แยก label — ระหว่าง countdown เปลี่ยนแค่ตัวเลข (กว้างคงที่ ไม่ต้อง re-layout ทั้งแถว)
+        status_row = tk.Frame(status_frame, bg=BG_COLOR)
+        status_row.pack()
+        self.status_var = tk.StringVar(value="Status: Ready")
         self.status_label = tk.Label(
-            status_frame,
-            text="Status: Ready",
-            font=('Helvetica', 10, 'bold'),
-            bg='#f0f0f0',
+            status_row,
+            textvariable=self.status_var,
+            font=FONT_10_BOLD,
+            bg=BG_COLOR,
             fg='#27ae60'
         )
-        self.status_label.pack()
+        self.status_label.pack(side='left')
+        self._label_vars[str(self.status_label)] = self.status_var
+        self.countdown_label = tk.Label(
+            status_row,
+            text="",
+            font=FONT_10_BOLD,
+            bg=BG_COLOR,
+            width=6,
+            anchor='w'
+        )
+        self.countdown_label.pack(side='left')
 
         # Indeterminate progress bar — แสดงเฉพาะตอนกำลัง save / process
         self.status_progressbar = ttk.Progressbar(
@@ -1721,19 +2119,15 @@ class HardwareControlGUI:
         # ไม่ pack ตอนเริ่มต้น (ซ่อนไว้)
 
         # Store for scaling
-        if 'status' not in self.scalable_widgets:
-            self.scalable_widgets['status'] = []
-        self.scalable_widgets['status'].append(self.status_label)
-        
-    def draw_circuit_diagram(self):
-        """Placeholder - Hardware diagram removed"""
-        pass
+        self._register_scalable('status', self.status_label, self.countdown_label)
         
     # ==================== DEVICE CONTROL ====================
     def toggle_device(self, device_key):
         """สลับสถานะอุปกรณ์"""
         # ใน Auto mode ขณะ Auto sequence กำลังรันอยู่ ไม่อนุญาตให้สั่ง manual (ป้องกันชนกัน)
-        if self.current_mode.get() == "auto" and self.running:
+        # _auto_active คลุมทั้ง sequence จนถึง _auto_complete — _fsm_state เป็น None ก่อนรอ processing เสร็จ
+        # ไม่ต้องอ่าน Tk var + เทียบ string ทุกคลิก
+        if self._auto_active:
             messagebox.showwarning(
                 "Auto Mode Running",
                 "ไม่สามารถสั่ง Manual ระหว่าง Auto Sequence กำลังทำงานอยู่\n"
@@ -1744,37 +2138,85 @@ class HardwareControlGUI:
         # ใช้ Hardware Controller toggle
         is_on = self.hardware.toggle_device(device_key)
 
-        # Update UI (switch button)
-        self.update_switch_button(device_key, is_on)
-        
-        # Update diagram
-        self.draw_circuit_diagram()
+        # Update UI (switch button) ผ่านทางเดียวกับ auto sequence
+        self._apply_ui_state_batch({device_key: is_on})
         
         # Update status
-        self.status_label.configure(text=f"Status: {device_key.title()} {'ON' if is_on else 'OFF'}")
+        self._mark_dirty(self.status_label, text=f"Status: {device_key.title()} {DEVICE_STATE_TEXT[is_on]}")
         
     def set_device_state(self, device_key, state):
         """ตั้งค่าสถานะอุปกรณ์โดยตรง"""
-        current_state = self.hardware.get_device_state(device_key)
-        
-        if current_state != state:
+        if self.hardware.get_device_state(device_key) != state:
             # ใช้ Hardware Controller control
             self.hardware.control_device(device_key, state)
-            
-            # Update UI (switch button)
-            self.update_switch_button(device_key, state)
-            
-            # Update diagram
-            self.draw_circuit_diagram()
+            self._apply_ui_state_batch({device_key: state})
             
     # ==================== AUTO SEQUENCE HELPERS ====================
     def _run_on_ui_thread(self, callback):
-        """Run callback on Tk UI thread."""
-        self.root.after(0, callback)
+        """Run callback on Tk UI thread.
+
+        callback เข้าคิว _ui_queue แล้วปลุก UI ด้วย virtual event (event_generate when='tail')
+        callback ที่ส่งมาติดๆ กันถูกรวมเป็น event เดียว (ไม่ใช่ root.after ต่อ callback)
+        """
+        self._ui_queue.append(callback)
+        with self._ui_flush_lock:
+            if self._ui_flush_scheduled:
+                return
+            self._ui_flush_scheduled = True
+        try:
+            self.root.event_generate(UI_WAKE_EVENT, when='tail')
+        except tk.TclError:
+            # root ถูก destroy แล้ว — ไม่มี UI ให้อัพเดท
+            pass
+
+    def _flush_ui_queue(self, event=None):
+        """รัน callback ทั้งหมดที่ค้างใน _ui_queue (บน UI thread)"""
+        with self._ui_flush_lock:
+            self._ui_flush_scheduled = False
+        while self._ui_queue:
+            callback = self._ui_queue.popleft()
+            try:
+                callback()
+            except Exception:
+                traceback.print_exc()
+
+    def _cached_configure(self, widget, **kwargs):
+        """configure เฉพาะ option ที่ค่าต่างจากที่ตั้งผ่าน method นี้ครั้งก่อน (ข้าม Tcl call ซ้ำ)
+
+        cache แยกตาม Tk path ของ widget — ใช้กับ widget ที่ถูก configure ผ่าน method นี้เท่านั้น
+        label ที่ผูก textvariable ไว้ (_label_vars) เปลี่ยน text ด้วย StringVar.set แทน configure
+        """
+        path = str(widget)
+        cache = self._cfg_cache.setdefault(path, {})
+        diff = {k: v for k, v in kwargs.items() if k not in cache or cache[k] != v}
+        if not diff:
+            return
+        cache.update(diff)
+        text_var = self._label_vars.get(path)
+        if text_var is not None and 'text' in diff:
+            text_var.set(diff.pop('text'))
+        if diff:
+            widget.configure(**diff)
+
+    def _mark_dirty(self, widget, **kwargs):
+        """ตั้งค่า option ของ widget ใน tick ถัดไป (thread-safe, ค่าล่าสุดชนะ)"""
+        with self._dirty_lock:
+            self._dirty.setdefault(widget, {}).update(kwargs)
+
+    def _ui_tick(self):
+        """flush label ที่ถูก _mark_dirty ไว้ รอบละครั้ง — จำกัดการอัพเดท label ไม่เกิน ~10 Hz"""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+        for widget, kwargs in dirty.items():
+            try:
+                self._cached_configure(widget, **kwargs)
+            except tk.TclError:
+                pass
+        self._ui_tick_id = self.root.after(UI_TICK_MS, self._ui_tick)
 
     def _set_status_text(self, text, color):
         """Update status label in thread-safe way."""
-        self._run_on_ui_thread(lambda: self.status_label.configure(text=text, fg=color))
+        self._mark_dirty(self.status_label, text=text, fg=color)
 
     def _show_progress(self, visible):
         """Show/hide and start/stop the indeterminate progress bar (thread-safe)."""
@@ -1794,39 +2236,72 @@ class HardwareControlGUI:
                 pass
         self._run_on_ui_thread(update)
 
-    def _update_device_ui_threadsafe(self, device_key, state):
-        """Thread-safe update of device UI"""
-        self._run_on_ui_thread(lambda: self.update_switch_button(device_key, state))
-    
-    def _set_devices(self, on=None, off=None):
-        """Set multiple devices and update UI (thread-safe)"""
-        if off:
-            for dev in off:
-                self.hardware.control_device(dev, False)
-                self._update_device_ui_threadsafe(dev, False)
-        if on:
-            for dev in on:
-                self.hardware.control_device(dev, True)
-                self._update_device_ui_threadsafe(dev, True)
-        time.sleep(0.3)
+    def _apply_ui_state_batch(self, states):
+        """อัพเดท switch ของหลายอุปกรณ์ใน callback เดียว (เรียกบน UI thread)
+
+        วาดใหม่เฉพาะกล่องที่สถานะบนจอต่างจาก states
+        """
+        shown = self.device_states
+        for device_key, state in states.items():
+            if shown.get(device_key) != state:
+                self.update_switch_button(device_key, state)
+
+    def _apply_state(self, desired):
+        """ตั้งอุปกรณ์ตาม desired ({device: bool}) โดยเขียนเฉพาะตัวที่สถานะต่างจากปัจจุบัน
+
+        Returns:
+            dict: อุปกรณ์ที่เปลี่ยนจริง (ว่าง = ไม่มีอะไรต้องทำ)
+        """
+        diff = self.hardware.changed_states(desired)
+        if diff:
+            self.hardware.set_many(diff)
+            self._run_on_ui_thread(lambda: self._apply_ui_state_batch(diff))
+        return diff
+
+    def _set_devices(self, states):
+        """Set multiple devices and update UI (thread-safe) — states คือ {device: bool} ที่เตรียมไว้แล้ว"""
+        if self._apply_state(states):
+            # รอ relay นิ่งเฉพาะเมื่อมีการสลับจริง — กด Stop แล้วไม่ต้องรอต่อ
+            self._stop.wait(RELAY_SETTLE_SEC)
     
-    def _update_operation_ui(self, text, color, op_key=None):
-        """Update progress label and highlight operation frame"""
-        def update():
-            self.progress_label.configure(text=text, fg=color)
-            if op_key and op_key in self.operation_frames:
-                self.operation_frames[op_key].configure(bg=STATUS_COLORS["warning"])
-        self._run_on_ui_thread(update)
+    def _update_operation_ui(self, cycle, step):
+        """Update progress label and highlight operation frame (UI thread)
+
+        format ข้อความของ step ครั้งเดียวตอนเข้า step — ระหว่าง countdown เปลี่ยนแค่ countdown_label
+        """
+        color = STATUS_COLORS["warning"]
+        self._mark_dirty(self.progress_label, text=f"Cycle {cycle} - {step['ui_title']}", fg=color)
+        self._auto_status = (f"Cycle {cycle} | {step['countdown_title']} -", color)
+        self._set_operation_style(step["op_key"], 'Active')
     
     def _mark_operation_complete(self, op_key):
         """Mark an operation frame as complete (green)"""
-        if op_key in self.operation_frames:
-            self._run_on_ui_thread(lambda k=op_key: self.operation_frames[k].configure(bg='#81c784'))
+        self._queue_operation_style(op_key, 'Done')
 
     def _mark_operation_bypassed(self, op_key):
         """Mark operation as bypassed (duration=0 in Settings)"""
-        if op_key in self.operation_frames:
-            self._run_on_ui_thread(lambda k=op_key: self.operation_frames[k].configure(bg='#bdbdbd'))
+        self._queue_operation_style(op_key, 'Bypassed')
+
+    def _queue_operation_style(self, op_key, state):
+        """ส่งการเปลี่ยน style ของ op frame ไป UI thread (ข้ามถ้าหน้า Settings ยังไม่ถูกสร้าง)"""
+        frame = self.operation_frames.get(op_key)
+        if frame is not None:
+            self._styled_ops.add(op_key)
+            self._run_on_ui_thread(partial(self._cached_configure, frame, style=f'Op.{state}.TFrame'))
+
+    def _build_cycle_plan(self, durations):
+        """แปลง AUTO_OPERATION_STEPS + durations เป็นแผนของ 1 cycle (คำนวณใหม่เมื่อ duration เปลี่ยน)
+
+        Returns:
+            tuple of (step, duration, start_collection) — duration <= 0 คือ bypass
+        """
+        plan = []
+        collection_started = False
+        for step in AUTO_OPERATION_STEPS:
+            start_coll = self._should_start_collection_for_step(step, durations, collection_started)
+            collection_started = collection_started or start_coll
+            plan.append((step, durations[step["duration_key"]], start_coll))
+        return tuple(plan)
 
     def _should_start_collection_for_step(self, step, durations, collection_started):
         """เริ่มเก็บข้อมูลที่ Baseline หรือขั้นแรกหลัง bypass Baseline"""
@@ -1840,109 +2315,162 @@ class HardwareControlGUI:
             return True
         return False
     
-    def _countdown(self, duration, operation_name):
-        """Run countdown timer, returns False if stopped"""
-        for remaining in range(duration, 0, -1):
-            if not self.running:
-                return False
-            mins, secs = divmod(remaining, 60)
-            def update_timer(m=mins, s=secs, r=remaining, op=operation_name, c=self.current_cycle):
-                self.timer_label.configure(text=f"{m:02d}:{s:02d}")
-                self.status_label.configure(
-                    text=f"Cycle {c} | {op} - {r}s remaining", fg=STATUS_COLORS["warning"])
-            self._run_on_ui_thread(update_timer)
-            time.sleep(1)
-        return True
-    
-    def _countdown_break(self, duration):
-        """Run break countdown timer, returns False if stopped"""
-        for remaining in range(duration, 0, -1):
-            if not self.running:
-                return False
-            mins, secs = divmod(remaining, 60)
-            def update_timer(m=mins, s=secs, r=remaining):
-                self.timer_label.configure(text=f"{m:02d}:{s:02d}")
-                self.status_label.configure(
-                    text=f"Break Time - Next cycle in {r}s", fg=STATUS_COLORS["idle"])
-            self._run_on_ui_thread(update_timer)
-            time.sleep(1)
-        return True
-    
+    @property
+    def running(self):
+        """True ระหว่าง operation — อ่านจาก _stop (Event) ไม่มี bool แยกให้หลุด sync"""
+        return not self._stop.is_set()
+
+    @running.setter
+    def running(self, value):
+        if value:
+            self._stop.clear()
+        else:
+            self._stop.set()
+
+    def _countdown_ticks(self, duration):
+        """Yield วินาทีที่เหลือ (นับจาก deadline ด้วย time.monotonic) — jitter ไม่สะสม
+
+        หยุด yield เมื่อครบเวลาหรือ self.running เป็น False
+        """
+        deadline = time.monotonic() + duration
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            r_int = math.ceil(remaining)
+            yield r_int
+            # รอถึงขอบวินาทีถัดไปของ deadline — ตื่นทันทีถ้ากด Stop (ไม่ต้อง poll)
+            self._stop.wait(max(0.0, min(1.0, deadline - time.monotonic() - (r_int - 1))))
+
+    def _new_collection_stop(self):
+        """stop event ของการเก็บข้อมูลรอบใหม่ (set แล้วทุก collection process ของรอบนี้หยุด)"""
+        return CollectionStop(self._collection_generation, self._collection_generation.value)
+
+    @staticmethod
+    def _create_collection_pool():
+        """สร้าง shared generation + collection pool (2 process: ADC + BME280) คู่กันใหม่
+
+        ส่งงานเปล่าเข้าไปทันที 1 งานต่อ process — pool แบบ spawn สร้าง process ตอน submit
+        ถ้ารอถึง Start แรก การ import collector จะไปกินเวลาช่วงต้นของ Baseline
+        """
+        mp_spawn = multiprocessing.get_context('spawn')
+        generation = mp_spawn.Value('i', 0, lock=False)
+        pool = ProcessPoolExecutor(
+            max_workers=COLLECTION_WORKERS, mp_context=mp_spawn,
+            initializer=init_collection_worker, initargs=(generation,))
+        for _ in range(COLLECTION_WORKERS):
+            pool.submit(warm_up)
+        return generation, pool
+
+    def _collect(self, kind, stop_event):
+        """เก็บข้อมูล kind ('adc' | 'bme') ใน collection process แล้วรอ path ไฟล์ที่บันทึก"""
+        pool = self._collection_pool
+        try:
+            return pool.submit(collect_in_worker, kind, stop_event.generation).result()
+        except BrokenProcessPool:
+            self._set_status_text(
+                f"Status: {kind.upper()} collection process crashed - data for this cycle lost",
+                STATUS_COLORS["idle"]
+            )
+            self._restart_collection_pool(pool)
+            raise
+
+    def _restart_collection_pool(self, broken_pool):
+        """collection process ตาย (BrokenProcessPool) — สร้าง pool + generation ใหม่ให้ cycle ถัดไปเก็บข้อมูลได้
+
+        ADC และ BME280 อาจเจอ pool พังพร้อมกัน — สร้างใหม่ครั้งเดียวต่อ pool ที่พัง
+        """
+        with self._collection_pool_lock:
+            if self._collection_pool is not broken_pool or self._closing:
+                return
+            print("Collection process pool broken - restarting")
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            self._collection_generation, self._collection_pool = self._create_collection_pool()
+
     def _start_data_collection(self):
-        """Start ADC + BME280 data collection threads (ใช้ stop_event ตัวเดียวกัน)"""
-        self.stop_collection_event = threading.Event()
+        """Start ADC + BME280 data collection (ใช้ stop_event ตัวเดียวกัน)"""
+        stop_event = self.stop_collection_event = self._new_collection_stop()
+        # ผูกค่าที่ wrapper ใช้ไว้เป็น local — cycle ไม่เปลี่ยนตาม self.current_cycle ระหว่างเก็บ
+        cycle = self.current_cycle
+        collect = self._collect
+        verbose = COLLECTION_VERBOSE
         
         if DATA_COLLECTION_AVAILABLE:
+            set_status = self._set_status_text
+            saved_color = STATUS_COLORS["success"]
+
             def adc_wrapper():
                 try:
-                    print(f"Cycle {self.current_cycle}: Starting ADC data collection...")
-                    file_path = run_collection(self.stop_collection_event)
+                    if verbose:
+                        print(f"Cycle {cycle}: Starting ADC data collection...")
+                    file_path = collect('adc', stop_event)
                     self.data_collection_file_path = file_path
                     if file_path:
-                        print(f"Cycle {self.current_cycle}: ADC data saved: {file_path}")
-                        cycle_num = self.current_cycle
-                        file_name = file_path.name
-                        self._set_status_text(
-                            f"Cycle {cycle_num} | ADC data saved to {file_name}",
-                            STATUS_COLORS["success"]
-                        )
+                        if verbose:
+                            print(f"Cycle {cycle}: ADC data saved: {file_path}")
+                        set_status(f"Cycle {cycle} | ADC data saved to {file_path.name}", saved_color)
                     else:
-                        print(f"Cycle {self.current_cycle}: ADC data collection returned None")
+                        print(f"Cycle {cycle}: ADC data collection returned None")
                 except Exception as e:
-                    print(f"Cycle {self.current_cycle}: ADC error: {e}")
+                    print(f"Cycle {cycle}: ADC error: {e}")
                     traceback.print_exc()
             
-            self.data_collection_thread = threading.Thread(target=adc_wrapper, daemon=True)
-            self.data_collection_thread.start()
-            print(f"Cycle {self.current_cycle}: ADC collection thread started")
+            self.data_collection_future = self._io_pool.submit(adc_wrapper)
+            if verbose:
+                print(f"Cycle {cycle}: ADC collection thread started")
         
         if BME_COLLECTION_AVAILABLE:
             def bme_wrapper():
                 try:
-                    print(f"Cycle {self.current_cycle}: Starting BME280 data collection...")
-                    file_path = run_bme_collection(self.stop_collection_event)
+                    if verbose:
+                        print(f"Cycle {cycle}: Starting BME280 data collection...")
+                    file_path = collect('bme', stop_event)
                     self.bme_collection_file_path = file_path
                     if file_path:
-                        print(f"Cycle {self.current_cycle}: BME280 data saved: {file_path}")
+                        if verbose:
+                            print(f"Cycle {cycle}: BME280 data saved: {file_path}")
                     else:
-                        print(f"Cycle {self.current_cycle}: BME280 data collection returned None")
+                        print(f"Cycle {cycle}: BME280 data collection returned None")
                 except Exception as e:
-                    print(f"Cycle {self.current_cycle}: BME280 error: {e}")
+                    print(f"Cycle {cycle}: BME280 error: {e}")
                     traceback.print_exc()
             
-            self.bme_collection_thread = threading.Thread(target=bme_wrapper, daemon=True)
-            self.bme_collection_thread.start()
-            print(f"Cycle {self.current_cycle}: BME280 collection thread started")
+            self.bme_collection_future = self._io_pool.submit(bme_wrapper)
+            if verbose:
+                print(f"Cycle {cycle}: BME280 collection thread started")
     
     def _stop_data_collection(self):
         """Stop data collection threads (ADC + BME280) and wait for save to finish.
 
-        เรียกจาก auto-sequence thread ดังนั้น join() ไม่บล็อก UI
+        เรียกจาก _seq_pool (auto sequence) ดังนั้น join() ไม่บล็อก UI
         ใช้ timeout ยาว (60s) เพื่อให้แน่ใจว่า np.savez() เสร็จสมบูรณ์ก่อนประมวลผล
         """
         if self.stop_collection_event is not None:
             self.stop_collection_event.set()
 
-        if self.data_collection_thread is not None and self.data_collection_thread.is_alive():
-            print(f"Cycle {self.current_cycle}: Stopping ADC collection...")
-            self.data_collection_thread.join(timeout=60)
-            if self.data_collection_thread.is_alive():
-                print(f"Cycle {self.current_cycle}: Warning: ADC thread did not stop in time")
-            else:
-                print(f"Cycle {self.current_cycle}: ADC collection stopped successfully")
+        cycle = self.current_cycle
+        pending = {
+            name: future for name, future in (
+                ('ADC', self.data_collection_future),
+                ('BME280', self.bme_collection_future),
+            ) if self._is_running(future)
+        }
+        if not pending:
+            return
 
-        if self.bme_collection_thread is not None and self.bme_collection_thread.is_alive():
-            print(f"Cycle {self.current_cycle}: Stopping BME280 collection...")
-            self.bme_collection_thread.join(timeout=60)
-            if self.bme_collection_thread.is_alive():
-                print(f"Cycle {self.current_cycle}: Warning: BME280 thread did not stop in time")
+        # รอ ADC + BME280 พร้อมกันภายใน deadline เดียว (ไม่ใช่ 60s ต่อ future)
+        print(f"Cycle {cycle}: Stopping {' + '.join(pending)} collection...")
+        _, not_done = wait_futures(pending.values(), timeout=60)
+        for name, future in pending.items():
+            if future in not_done:
+                print(f"Cycle {cycle}: Warning: {name} thread did not stop in time")
             else:
-                print(f"Cycle {self.current_cycle}: BME280 collection stopped successfully")
+                print(f"Cycle {cycle}: {name} collection stopped successfully")
     
-    def _run_data_processing(self):
-        """Process latest collected data using stored input paths.
+    def _run_data_processing(self, input_paths=None, cycle_num=None):
+        """Process collected data (default: input paths ของ cycle ปัจจุบัน).
 
-        เรียกได้เฉพาะใน background thread (เช่น auto-sequence thread หรือ stop worker)
+        เรียกได้เฉพาะใน background thread (เช่น _post_pool หรือ stop worker)
         เพราะ process_all_data เป็นงานที่ใช้ CPU/IO หนัก
 
         Returns
@@ -1953,16 +2481,22 @@ class HardwareControlGUI:
         if not DATA_PROCESSING_AVAILABLE:
             return False, None
 
-        cycle_num = self.current_cycle
-        try:
-            print(f"Cycle {cycle_num}: Starting data processing...")
+        if cycle_num is None:
+            cycle_num = self.current_cycle
+        if input_paths is None:
             input_paths = {
                 'adc1263': self.data_collection_file_path,
                 'bme280': self.bme_collection_file_path,
             }
-            results = process_all_data(input_paths=input_paths)
+        try:
+            print(f"Cycle {cycle_num}: Starting data processing...")
+            future = self._process_pool.submit(process_all_data, input_paths=input_paths)
+            results = future.result(timeout=PROCESSING_RESULT_TIMEOUT_SEC)
             print(f"Cycle {cycle_num}: Data processing completed")
             return True, results
+        except FutureTimeoutError:
+            print(f"Cycle {cycle_num}: Processing timed out after {PROCESSING_RESULT_TIMEOUT_SEC}s")
+            return False, None
         except Exception as e:
             print(f"Cycle {cycle_num}: Processing error: {e}")
             traceback.print_exc()
@@ -1979,7 +2513,7 @@ class HardwareControlGUI:
 
         temp_set = None
         try:
-            cfg = load_config()
+            cfg = load_config(copy_result=False)
             temp_set = cfg.get("lab_temp_set")   # อุณหภูมิห้องทดลอง (30/40/50 °C)
         except Exception:
             pass
@@ -2037,7 +2571,7 @@ class HardwareControlGUI:
             return
 
         def on_status(phase, msg):
-            self.root.after(0, lambda p=phase, m=msg: self._update_cloud_status(p, m))
+            self._run_on_ui_thread(lambda p=phase, m=msg: self._update_cloud_status(p, m))
 
         try:
             upload_cycle_files(adc_npz, bme_npz, adc_csv, bme_csv, on_status=on_status)
@@ -2047,44 +2581,57 @@ class HardwareControlGUI:
                 lambda m=str(e): self._update_cloud_status("error", f"Cloud: {m[:80]}")
             )
     
+    @staticmethod
+    def _is_running(future):
+        """True ถ้า future ของ collection ยังทำงานอยู่"""
+        return future is not None and not future.done()
+
     def _cleanup_collection_threads(self):
         """Clean up any running collection threads from previous cycle (ADC + BME280)"""
-        adc_alive = self.data_collection_thread is not None and self.data_collection_thread.is_alive()
-        bme_alive = self.bme_collection_thread is not None and self.bme_collection_thread.is_alive()
+        pending = [
+            f for f in (self.data_collection_future, self.bme_collection_future)
+            if self._is_running(f)
+        ]
         
-        if adc_alive or bme_alive:
+        if pending:
             if self.stop_collection_event is not None:
                 self.stop_collection_event.set()
             
-            if adc_alive:
-                self.data_collection_thread.join(timeout=2)
-            if bme_alive:
-                self.bme_collection_thread.join(timeout=2)
+            # รอ ADC + BME280 พร้อมกันภายใน deadline เดียว (ไม่ใช่ต่อกันทีละ future)
+            wait_futures(pending, timeout=CLEANUP_WAIT_TIMEOUT_SEC)
         
         self._reset_collection_vars()
     
     def _reset_collection_vars(self):
         """Reset collection variables"""
         self.stop_collection_event = None
-        self.data_collection_thread = None
-        self.bme_collection_thread = None
+        self.data_collection_future = None
+        self.bme_collection_future = None
         self.data_collection_file_path = None
         self.bme_collection_file_path = None
 
+    def _schedule_refresh_durations(self, *_):
+        """StringVar ของ duration ถูกเขียน — เลื่อน _refresh_durations ไปจนหยุดพิมพ์ DURATION_DEBOUNCE_MS"""
+        if self._durations_after_id is not None:
+            self.root.after_cancel(self._durations_after_id)
+        self._durations_after_id = self.root.after(DURATION_DEBOUNCE_MS, self._refresh_durations)
+
+    def _refresh_durations(self):
+        """parse duration + สร้าง cycle plan ใหม่ (บน UI thread: ตอนเริ่ม และหลัง StringVar หยุดถูกเขียน)
+
+        auto sequence อ่านแค่ _durations/_cycle_plan ที่เตรียมไว้ ไม่แตะ Tk variable
+        """
+        if self._durations_after_id is not None:
+            self.root.after_cancel(self._durations_after_id)
+            self._durations_after_id = None
+        durations = self._get_operation_durations()
+        self._cycle_plan = self._build_cycle_plan(durations)
+        self._durations = durations
+
     def _get_operation_durations(self):
         """อ่านค่า duration จาก UI พร้อม fallback ค่า default"""
-        defaults = {
-            'heating': 1800,
-            'baseline': 30,
-            'vacuum': 10,
-            'mix_air': 10,
-            'measure': 60,
-            'vacuum_return': 10,
-            'recovery': 60,
-            'break_time': 1620
-        }
         durations = {}
-        for key, default_value in defaults.items():
+        for key, default_value in OPERATION_DEFAULTS.items():
             try:
                 durations[key] = int(self.operation_durations[key].get())
             except (ValueError, KeyError):
@@ -2097,19 +2644,29 @@ class HardwareControlGUI:
         Args:
             preserve: list of device keys ที่จะไม่ปิด (เช่น ['heater'])
         """
-        preserve = preserve or []
-        for device_key in self.hardware.available_devices:
-            if device_key not in preserve:
-                self.hardware.control_device(device_key, False)
-                self.update_switch_button(device_key, False)
-
-    def _reset_ui_after_stop(self, mode, status_text="Status: Stopped", status_color='#e74c3c', preserve_devices=None):
-        """รีเซ็ต UI หลังหยุดการทำงาน (ใช้ร่วมกันทั้ง manual/auto)"""
+        key = tuple(preserve or ())
+        desired = self._off_state_maps.get(key)
+        if desired is None:
+            desired = self._off_state_maps[key] = {
+                dev: False for dev in self.hardware.available_devices if dev not in key
+            }
+        # เรียกบน UI thread — เขียน hardware แล้วซิงก์ UI ทั้งชุดในรอบเดียว
+        # (ไม่ผ่าน _apply_state ที่จะ queue batch ซ้ำอีกรอบ) วาดเฉพาะกล่องที่ยังแสดง ON
+        diff = self.hardware.changed_states(desired)
+        if diff:
+            self.hardware.set_many(diff)
+        self._apply_ui_state_batch(desired)
+
+    def _reset_ui_after_stop(self, mode, status_text="Status: Stopped", status_color='#e74c3c'):
+        """รีเซ็ต UI หลังหยุดการทำงาน (ทางเดียวของทั้ง manual/auto — ทั้งหยุดตอนรันอยู่และไม่ได้รัน)"""
         self._reset_collection_vars()
-        self._sync_all_devices_off(preserve=preserve_devices)
+        # คง Heater ไว้ถ้ายังเปิดอยู่ (Manual + Auto — สอดคล้องกับ _finalize_cycle_devices_and_processing)
+        preserve = None
+        if self.hardware.get_device_state('heater'):
+            preserve = CYCLE_PRESERVED_DEVICES
+        self._sync_all_devices_off(preserve=preserve)
 
-        self.current_operation = None
-        self.current_operation_index = -1
+        self._cs.reset()
 
         self.start_btn.configure(
             text="Start Auto Sequence" if mode == 'auto' else "Start Collection",
@@ -2117,49 +2674,16 @@ class HardwareControlGUI:
             bg='#27ae60'
         )
         self.stop_btn.configure(bg=STATUS_COLORS["idle"], state='normal')
-        self.progress_label.configure(text="Stopped", fg='#e74c3c')
-        self.timer_label.configure(text="--:--")
+        self._mark_dirty(self.progress_label, text="Stopped", fg='#e74c3c')
+        self._mark_dirty(self.timer_label, text="--:--")
         if status_text is not None:
-            self.status_label.configure(text=status_text, fg=status_color)
+            self._mark_dirty(self.status_label, text=status_text, fg=status_color)
 
         if mode == 'auto':
             self.reset_operation_colors()
 
-        self.draw_circuit_diagram()
-
-    def _run_auto_step(
-        self,
-        op_key,
-        ui_title,
-        duration,
-        countdown_title,
-        on=None,
-        off=None,
-        start_collection=False
-    ):
-        """รันหนึ่ง operation step ใน auto sequence"""
-        if not self.running:
-            return False
-
-        if start_collection and DATA_COLLECTION_AVAILABLE and self.running:
-            self._start_data_collection()
-
-        self.current_operation = op_key
-        self._update_operation_ui(
-            f"Cycle {self.current_cycle} - {ui_title}",
-            STATUS_COLORS["warning"],
-            op_key
-        )
-        self._set_devices(on=on, off=off)
-
-        if not self._countdown(duration, countdown_title):
-            return False
-
-        self._mark_operation_complete(op_key)
-        return True
-
     def _finalize_cycle_devices_and_processing(self):
-        """หยุด collection, ปิดอุปกรณ์ยกเว้น Heater (เหมือนหลัง Stop ใน Manual), และประมวลผลข้อมูล (รันใน auto-thread)"""
+        """หยุด collection, ปิดอุปกรณ์ยกเว้น Heater (เหมือนหลัง Stop ใน Manual), และส่งงานประมวลผลเข้า _post_pool (รันใน _seq_pool)"""
         cycle_num = self.current_cycle
         self._set_status_text(
             f"Cycle {cycle_num} | Saving data...", STATUS_COLORS["processing"]
@@ -2169,54 +2693,49 @@ class HardwareControlGUI:
         self._stop_data_collection()
 
         # คง Heater ไว้เปิดหลังจบรอบ (Auto sequence เปิด heater ตลอด Op1–Op7)
-        preserve = ['heater']
-        for dev in self.hardware.available_devices:
-            if dev in preserve:
-                self._update_device_ui_threadsafe(dev, True)
-                continue
-            self.hardware.control_device(dev, False)
-            self._update_device_ui_threadsafe(dev, False)
+        # = สถานะของ Op1 cycle ถัดไป จึงไม่ต้องปิด/เปิด heater ซ้ำ
+        self._apply_state(self._cycle_end_states)
 
         if self.running and DATA_PROCESSING_AVAILABLE:
-            self._set_status_text(
-                f"Cycle {cycle_num} | Processing...", STATUS_COLORS["processing"]
+            # ประมวลผลคู่ขนานกับ break/cycle ถัดไป — ไม่บล็อก sequencer
+            input_paths = {
+                'adc1263': self.data_collection_file_path,
+                'bme280': self.bme_collection_file_path,
+            }
+            future = self._post_pool.submit(self._process_cycle_results, cycle_num, input_paths)
+            future.add_done_callback(
+                lambda _f: self._run_on_ui_thread(self._refresh_display_graph_if_visible)
             )
-            adc_npz = self.data_collection_file_path
-            bme_npz = self.bme_collection_file_path
-            ok, proc_paths = self._run_data_processing()
-            if ok:
-                self._set_status_text(
-                    f"Cycle {cycle_num} | Data processed!", STATUS_COLORS["success"]
-                )
-                self._maybe_cloud_upload(adc_npz, bme_npz, proc_paths)
-                self._run_methane_prediction(proc_paths)
-            else:
-                self._set_status_text(
-                    f"Cycle {cycle_num} | Processing error", STATUS_COLORS["idle"]
-                )
-
-        self._show_progress(False)
-        self._run_on_ui_thread(self._refresh_display_graph_if_visible)
+            self._pending_process_futures = [
+                f for f in self._pending_process_futures if not f.done()
+            ] + [future]
+        else:
+            self._show_progress(False)
         self._reset_collection_vars()
 
-    def _run_break_time_if_needed(self, break_duration):
-        """รัน break time ระหว่าง cycle ถ้าตั้งเวลาไว้"""
-        if break_duration <= 0 or not self.running:
-            return
-
-        self.current_operation = 'break_time'
-        self.current_operation_index = -1
-
-        def update_break_ui(c=self.current_cycle):
-            self.progress_label.configure(
-                text=f"Cycle {c} Complete - Break Time", fg=STATUS_COLORS["idle"])
-            if 'break_time' in self.operation_frames:
-                self.operation_frames['break_time'].configure(bg='#e57373')
+    def _process_cycle_results(self, cycle_num, input_paths):
+        """ประมวลผล + cloud upload + ทำนาย ppm ของ cycle ที่จบแล้ว (รันใน _post_pool)"""
+        self._set_status_text(
+            f"Cycle {cycle_num} | Processing...", STATUS_COLORS["processing"]
+        )
+        ok, proc_paths = self._run_data_processing(input_paths, cycle_num)
+        if ok:
+            self._set_status_text(
+                f"Cycle {cycle_num} | Data processed!", STATUS_COLORS["success"]
+            )
+            self._maybe_cloud_upload(input_paths['adc1263'], input_paths['bme280'], proc_paths)
+            self._run_methane_prediction(proc_paths)
+        else:
+            self._set_status_text(
+                f"Cycle {cycle_num} | Processing error", STATUS_COLORS["idle"]
+            )
+        self._show_progress(False)
 
-        self._run_on_ui_thread(update_break_ui)
-        self._countdown_break(break_duration)
-        self._run_on_ui_thread(lambda: self.operation_frames['break_time'].configure(bg=OPERATION_FRAME_COLORS['break_time']))
-        self._run_on_ui_thread(self.reset_operation_colors)
+    def _enter_break_ui(self, cycle):
+        """UI ตอนเข้า break time หลังจบ cycle"""
+        self._mark_dirty(self.progress_label,
+            text=f"Cycle {cycle} Complete - Break Time", fg=STATUS_COLORS["idle"])
+        self._set_operation_style('break_time', 'Break')
     
     # ==================== MANUAL TIMER HELPERS ====================
     def _on_manual_timer_toggle(self):
@@ -2225,7 +2744,7 @@ class HardwareControlGUI:
             self.manual_timer_entry.configure(state='normal')
         else:
             self.manual_timer_entry.configure(state='disabled')
-            self.manual_timer_remaining_label.configure(text="")
+            self._mark_dirty(self.manual_timer_remaining_label, text="")
 
     def _parse_seconds(self, text):
         """แปลงค่า seconds จากข้อความ คืน int หรือ None ถ้า invalid"""
@@ -2236,30 +2755,21 @@ class HardwareControlGUI:
         except ValueError:
             return None
 
-    def _run_manual_timer(self, total_seconds):
-        """รัน countdown timer ใน background thread สำหรับ Manual mode
+    def _run_manual_timer(self, total_seconds, stop_evt):
+        """รัน countdown timer ใน _io_pool สำหรับ Manual mode
         
         อัพเดท remaining label ทุก 1 วินาที เมื่อหมดเวลาเรียก stop_operation อัตโนมัติ
-        ออกเงียบเมื่อ manual_timer_stop_event ถูก set (ผู้ใช้กด Stop ก่อนครบเวลา)
+        ออกเงียบเมื่อ stop_evt (manual_timer_stop_event) ถูก set (ผู้ใช้กด Stop ก่อนครบเวลา)
+        นับจาก deadline เดียวกับ auto countdown (_countdown_ticks) — ไม่สะสม drift, ตื่นทันทีเมื่อ Stop
         """
-        stop_evt = self.manual_timer_stop_event
-        for remaining in range(total_seconds, 0, -1):
-            if stop_evt.is_set() or not self.running:
+        for remaining in self._countdown_ticks(total_seconds):
+            if stop_evt.is_set():
                 return
-            mins, secs = divmod(remaining, 60)
-            display = f"{mins:02d}:{secs:02d}"
-            self._run_on_ui_thread(
-                lambda t=display: self.manual_timer_remaining_label.configure(
-                    text=f"เหลือ {t}"
-                )
-            )
-            stop_evt.wait(timeout=1)
+            self._mark_dirty(self.manual_timer_remaining_label, text=f"เหลือ {format_mmss(remaining)}")
 
         if not stop_evt.is_set() and self.running:
-            self._run_on_ui_thread(
-                lambda: self.manual_timer_remaining_label.configure(text="หมดเวลา")
-            )
-            self.root.after(0, self.stop_operation)
+            self._mark_dirty(self.manual_timer_remaining_label, text="หมดเวลา")
+            self._run_on_ui_thread(self.stop_operation)
 
     # ==================== OPERATION CONTROL ====================
     def _start_manual_mode(self):
@@ -2282,14 +2792,14 @@ class HardwareControlGUI:
         self.running = True
         self.start_btn.configure(bg=STATUS_COLORS["running"], text="Collecting...", state='disabled')
         self.stop_btn.configure(bg='#c0392b', state='normal')
-        self.status_label.configure(text="Status: Collecting data...", fg=STATUS_COLORS["running"])
-        self.stop_collection_event = threading.Event()
+        self._mark_dirty(self.status_label, text="Status: Collecting data...", fg=STATUS_COLORS["running"])
+        self.stop_collection_event = self._new_collection_stop()
 
         def adc_collection_wrapper():
             if DATA_COLLECTION_AVAILABLE:
                 try:
                     print("Starting ADC data collection in manual mode...")
-                    self.data_collection_file_path = run_collection(self.stop_collection_event)
+                    self.data_collection_file_path = self._collect('adc', self.stop_collection_event)
                     if self.data_collection_file_path:
                         print(f"ADC data collection completed: {self.data_collection_file_path}")
                         self._set_status_text(
@@ -2304,14 +2814,13 @@ class HardwareControlGUI:
             else:
                 print("ADC data collection not available")
 
-        self.data_collection_thread = threading.Thread(target=adc_collection_wrapper, daemon=True)
-        self.data_collection_thread.start()
+        self.data_collection_future = self._io_pool.submit(adc_collection_wrapper)
 
         if BME_COLLECTION_AVAILABLE:
             def bme_collection_wrapper():
                 try:
                     print("Starting BME280 data collection in manual mode...")
-                    bme_path = run_bme_collection(self.stop_collection_event)
+                    bme_path = self._collect('bme', self.stop_collection_event)
                     self.bme_collection_file_path = bme_path
                     if bme_path:
                         print(f"BME280 data collection completed: {bme_path}")
@@ -2320,200 +2829,333 @@ class HardwareControlGUI:
                     print(error_msg)
                     traceback.print_exc()
 
-            self.bme_collection_thread = threading.Thread(target=bme_collection_wrapper, daemon=True)
-            self.bme_collection_thread.start()
+            self.bme_collection_future = self._io_pool.submit(bme_collection_wrapper)
 
         # เริ่ม timer thread ถ้าผู้ใช้เปิดใช้งาน
         if timer_seconds is not None:
             self.manual_timer_stop_event = threading.Event()
-            self.manual_timer_thread = threading.Thread(
-                target=self._run_manual_timer,
-                args=(timer_seconds,),
-                daemon=True
+            self.manual_timer_future = self._io_pool.submit(
+                self._run_manual_timer, timer_seconds, self.manual_timer_stop_event
             )
-            self.manual_timer_thread.start()
 
     def _start_auto_mode(self):
         """Start auto sequence mode."""
+        # อ่าน loop settings บน UI thread ครั้งเดียวตอน Start
+        if self.infinite_loop.get():
+            self._loop_limit = None
+        else:
+            try:
+                self._loop_limit = int(self.loop_count.get())
+            except ValueError:
+                self._loop_limit = 0
         self.running = True
         self.start_btn.configure(bg=STATUS_COLORS["running"], text="Running...", state='disabled')
         self.stop_btn.configure(bg='#c0392b', state='normal')
-        self.progress_label.configure(text="Starting sequence...", fg=STATUS_COLORS["running"])
-        thread = threading.Thread(target=self.run_auto_sequence, daemon=True)
-        thread.start()
+        self._mark_dirty(self.progress_label, text="Starting sequence...", fg=STATUS_COLORS["running"])
+        self.current_cycle = 0
+        self._auto_run_id += 1
+        self._auto_active = True
+        self._fsm_state = ('cycle', None, None)
+        self._auto_begin_cycle()
 
     def start_operation(self):
         """เริ่มการทำงาน"""
-        if self.running:
+        if self.running or self._closing:
             return
             
         mode = self.current_mode.get()
+        _ensure_pipeline_imports()  # ปกติเสร็จแล้วจาก background import ตอนเปิดโปรแกรม
         
         if mode == "manual":
             self._start_manual_mode()
         elif mode == "auto":
             self._start_auto_mode()
             
-    def run_auto_sequence(self):
-        """รันลำดับ Auto 7 Operations พร้อม Loop และ Break Time
-        
-        Operation Plan (heater ON ตลอด Op1-Op7, ADC recording ตลอด Op2-Op7):
-        1. Heating:       heater ON (1800s)
-        [เริ่มเก็บข้อมูล ADC]
-        2. Baseline:      heater + s_valve1 + s_valve3 + pump ON (30s)
-        3. Vacuum:        heater + s_valve3 + pump ON (10s) [seamless จาก Op2]
-        4. Mix Air:       heater + fan ON (10s)
-        5. Measure:       heater + s_valve2 + pump ON (60s)
-        6. Vacuum Return: heater + pump + s_valve4 ON (10s)
-        7. Recovery:      heater + s_valve1 + s_valve3 + pump ON (60s)
-        [หยุดเก็บข้อมูล ADC → ปิดอุปกรณ์ยกเว้น Heater → process_data]
-        Break:            Heater คงไว้, อื่น OFF (1620s) → วน loop
+    # ==================== AUTO SEQUENCE (STATE MACHINE) ====================
+    # ลำดับ Auto 7 Operations พร้อม Loop และ Break Time
+    #
+    # Operation Plan (heater ON ตลอด Op1-Op7, ADC recording ตลอด Op2-Op7):
+    # 1. Heating:       heater ON (1800s)
+    # [เริ่มเก็บข้อมูล ADC]
+    # 2. Baseline:      heater + s_valve1 + s_valve3 + pump ON (30s)
+    # 3. Vacuum:        heater + s_valve3 + pump ON (10s) [seamless จาก Op2]
+    # 4. Mix Air:       heater + fan ON (10s)
+    # 5. Measure:       heater + s_valve2 + pump ON (60s)
+    # 6. Vacuum Return: heater + pump + s_valve4 ON (10s)
+    # 7. Recovery:      heater + s_valve1 + s_valve3 + pump ON (60s)
+    # [หยุดเก็บข้อมูล ADC → ปิดอุปกรณ์ยกเว้น Heater → process_data]
+    # Break:            Heater คงไว้, อื่น OFF (1620s) → วน loop
+    #
+    # ทุก method ด้านล่างรันบน UI thread — _fsm_state = (kind, step, deadline)
+    # งานที่บล็อก (relay settle, หยุด collection) ส่งเข้า _seq_pool
+    # แล้วเดิน state ต่อใน callback (_auto_submit) — ไม่มี thread ไหน poll self.running
+
+    def _auto_submit(self, job, then):
+        """รัน job ใน _seq_pool แล้วเรียก then บน UI thread เมื่อเสร็จ (แม้ job error)
+
+        then ผูกกับ run ที่ส่งงาน — ถ้ากด Start รอบใหม่ไปแล้วระหว่างรอ จะไม่เรียก then
+        (กันไม่ให้ callback ของ run เก่าไปเดิน/ปิด state machine ของ run ใหม่)
         """
-        
-        # Get loop settings
-        is_infinite = self.infinite_loop.get()
-        try:
-            max_cycles = int(self.loop_count.get()) if not is_infinite else 0
-        except ValueError:
-            max_cycles = 0
-        
-        self.current_cycle = 0
-        
-        # Main loop
-        while self.running:
-            self.current_cycle += 1
-            
-            # Update cycle counter
-            self.root.after(0, lambda c=self.current_cycle: 
-                          self.cycle_label.configure(text=f"Current Cycle: {c}"))
-            
-            # Clean up old threads from previous cycle
-            self._cleanup_collection_threads()
-            
-            # Get durations from UI
-            durations = self._get_operation_durations()
-            collection_started = False
-
-            for step in AUTO_OPERATION_STEPS:
-                duration = durations[step["duration_key"]]
-                if duration <= 0:
-                    print(
-                        f"Cycle {self.current_cycle}: Bypass {step['op_key']} "
-                        f"(duration=0)"
-                    )
-                    self._mark_operation_bypassed(step["op_key"])
-                    continue
-
-                start_coll = self._should_start_collection_for_step(
-                    step, durations, collection_started
-                )
-                if start_coll:
-                    collection_started = True
-
-                if not self._run_auto_step(
-                    step["op_key"],
-                    step["ui_title"],
-                    duration,
-                    step["countdown_title"],
-                    on=step.get("on"),
-                    off=step.get("off"),
-                    start_collection=start_coll,
-                ):
-                    break
-            else:
-                self._finalize_cycle_devices_and_processing()
-                
-                # Check if should continue looping
-                if not self.running:
-                    break
-                
-                if not is_infinite and self.current_cycle >= max_cycles:
-                    break
-                
-                self._run_break_time_if_needed(durations['break_time'])
+        run_id = self._auto_run_id
+
+        def run_if_current():
+            if run_id == self._auto_run_id:
+                then()
+
+        def done(future):
+            if future.exception() is not None:
+                print(f"Cycle {self.current_cycle}: sequence job error: {future.exception()}")
+            self._run_on_ui_thread(run_if_current)
+        self._seq_pool.submit(job).add_done_callback(done)
+
+    def _auto_begin_cycle(self):
+        """เริ่ม cycle ใหม่ — เคลียร์ collection ของรอบก่อนแล้วเข้า step แรก"""
+        self.current_cycle += 1
+        self._update_cycle_label(self.current_cycle)
+        # durations/plan เตรียมไว้แล้วบน UI thread (_refresh_durations) — ล็อกไว้ทั้ง cycle
+        if self._durations_after_id is not None:
+            self._refresh_durations()  # ยังมีค่าที่เพิ่งพิมพ์ค้าง debounce อยู่
+        self._auto_durations = self._durations
+        self._auto_steps = iter(self._cycle_plan)
+        self._auto_submit(self._cleanup_collection_threads, self._auto_next_step)
+
+    def _auto_next_step(self):
+        """เข้า step ถัดไปที่ไม่ถูก bypass หรือจบ cycle ถ้าไม่เหลือ step"""
+        if not self.running:
+            self._auto_finish()
+            return
+        for step, duration, start_coll in self._auto_steps:
+            op_key = step["op_key"]
+            if duration <= 0:
+                print(f"Cycle {self.current_cycle}: Bypass {op_key} (duration=0)")
+                self._mark_operation_bypassed(op_key)
                 continue
 
-            break
-        
-        # Complete
-        self.current_operation = None
-        self.current_operation_index = -1
+            if start_coll and DATA_COLLECTION_AVAILABLE:
+                self._start_data_collection()
+            self._cs.op = op_key
+            self._update_operation_ui(self.current_cycle, step)
+            # เริ่มนับเวลาหลัง relay นิ่งแล้ว (เหมือนเดิม) — deadline ตั้งใน _auto_enter_countdown
+            self._fsm_state = ('op', step, None)
+            self._auto_submit(
+                partial(self._set_devices, step["states"]),
+                partial(self._auto_enter_countdown, duration)
+            )
+            return
+
+        self._fsm_state = ('finalize', None, None)
+        self._auto_submit(self._finalize_cycle_devices_and_processing, self._auto_after_cycle)
+
+    def _auto_enter_countdown(self, duration):
+        """relay นิ่งแล้ว — ตั้ง deadline ของ state ปัจจุบันแล้วเริ่ม tick"""
+        if not self.running:
+            self._auto_finish()
+            return
+        self._begin_countdown(duration)
+
+    def _begin_countdown(self, duration):
+        """ตั้ง status ของ state ปัจจุบันครั้งเดียว แล้วเริ่ม tick จนครบ duration"""
+        text, color = self._auto_status
+        self._mark_dirty(self.status_label, text=text, fg=color)
+        self._mark_dirty(self.countdown_label, fg=color)
+        kind, step, _ = self._fsm_state
+        self._fsm_state = (kind, step, time.monotonic() + duration)
+        self._auto_tick()
+
+    def _auto_tick(self):
+        """1 tick ของ state machine — อัปเดต countdown หรือเลื่อนไป state ถัดไปเมื่อครบ deadline"""
+        self._auto_tick_id = None
+        if not self.running:
+            self._auto_finish()
+            return
+        kind, step, deadline = self._fsm_state
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._mark_dirty(self.countdown_label, text="")
+            if kind == 'op':
+                self._mark_operation_complete(step["op_key"])
+                self._auto_next_step()
+            else:
+                # reset_operation_colors คืนสี break_time ด้วย (อยู่ใน OPERATION_FRAME_COLORS)
+                self.reset_operation_colors()
+                self._auto_begin_cycle()
+            return
+
+        r_int = math.ceil(remaining)
+        self._mark_dirty(self.timer_label, text=format_mmss(r_int))
+        self._mark_dirty(self.countdown_label, text=f"{r_int}s")
+        # ตื่นที่ขอบวินาทีถัดไปของ deadline — jitter ไม่สะสม
+        delay_ms = math.ceil((remaining - (r_int - 1)) * 1000)
+        self._auto_tick_id = self.root.after(max(1, delay_ms), self._auto_tick)
+
+    def _auto_after_cycle(self):
+        """จบ cycle แล้ว — วน loop ต่อ (ผ่าน break time ถ้าตั้งไว้) หรือจบ sequence"""
+        if not self.running or (
+            self._loop_limit is not None and self.current_cycle >= self._loop_limit
+        ):
+            self._auto_finish()
+            return
+        break_duration = self._auto_durations['break_time']
+        if break_duration <= 0:
+            self._auto_begin_cycle()
+            return
+
+        self._cs.op = 'break_time'
+        self._cs.op_idx = -1
+        self._enter_break_ui(self.current_cycle)
+        self._auto_status = ("Break Time - Next cycle in", STATUS_COLORS["idle"])
+        self._fsm_state = ('break', None, None)
+        self._begin_countdown(break_duration)
+
+    def _cancel_auto_tick(self):
+        """ยกเลิก tick ที่รออยู่ (กด Stop / ปิดโปรแกรม)"""
+        if self._auto_tick_id is not None:
+            self.root.after_cancel(self._auto_tick_id)
+            self._auto_tick_id = None
+
+    def _auto_finish(self):
+        """จบ sequence (ครบ loop หรือกด Stop) — cycle สุดท้ายต้องรอผลประมวลผลก่อนแจ้งว่าจบ"""
+        if self._fsm_state is None:
+            return
+        self._fsm_state = None
+        self._cancel_auto_tick()
+        self._mark_dirty(self.countdown_label, text="")
+        # ตัดสินตอนนี้ว่าจบเพราะถูกหยุด (running ถูกเคลียร์แล้ว) หรือครบ loop
+        # — _stopping_in_progress อาจถูกเคลียร์ไปก่อน processing ที่ค้างจะเสร็จ
+        stopped = not self.running
+        # job เปล่าผ่าน _seq_pool แค่รอ finalize ที่อาจยังรันอยู่ให้ส่ง processing future เข้า list ครบ
+        # การรอ processing จริงไม่ครอง _seq_pool — กด Start รอบใหม่ได้ทันทีหลัง Stop
+        self._auto_submit(lambda: None, partial(self._auto_wait_processing, stopped))
+
+    def _auto_wait_processing(self, stopped):
+        """รอ processing ของ cycle ที่ค้างอยู่ด้วย done callback แล้วค่อย _auto_complete (UI thread)"""
+        pending = [f for f in self._pending_process_futures if not f.done()]
+        self._pending_process_futures = []
+        if pending:
+            print(f"Waiting for {len(pending)} pending processing job(s)...")
+        run_id = self._auto_run_id
+
+        def complete_if_current():
+            if run_id == self._auto_run_id:
+                self._auto_complete(stopped)
+        self._when_futures_done(
+            pending, complete_if_current, PROCESSING_RESULT_TIMEOUT_SEC,
+            "Warning: pending processing did not finish in time",
+        )
+
+    def _auto_complete(self, stopped):
+        """processing ที่ค้างเสร็จแล้ว — รีเซ็ตสถานะและแจ้ง UI (เฉพาะ run ที่ยังเป็นปัจจุบัน ดู _auto_submit)"""
+        self._cs.reset()
         self.running = False
-        self.root.after(0, self.operation_complete)
-        
+        self._auto_active = False
+        self.operation_complete(stopped=stopped)
+
     def _set_multiple_devices_ui(self, devices_off, devices_on):
         """Helper function สำหรับตั้งค่าหลายอุปกรณ์และอัพเดท UI"""
-        # Turn OFF devices first
-        for dev in devices_off:
-            self.set_device_state(dev, False)
+        # OFF ก่อน ON — set_many เรียงลำดับให้เอง
+        states = dict.fromkeys(devices_off, False)
+        states.update(dict.fromkeys(devices_on, True))
+        self._apply_state(states)
         
-        # Turn ON devices
-        for dev in devices_on:
-            self.set_device_state(dev, True)
-        
-    def operation_complete(self):
-        """เมื่อ operation เสร็จสิ้น (auto sequence จบ หรือถูกผู้ใช้หยุด)"""
+    def operation_complete(self, stopped=False):
+        """เมื่อ operation เสร็จสิ้น (auto sequence จบ หรือถูกผู้ใช้หยุด — stopped=True)"""
         self.start_btn.configure(bg=STATUS_COLORS["success"], text="Start Auto Sequence", state='normal')
         self.stop_btn.configure(bg=STATUS_COLORS["idle"], state='normal')
 
         # ถ้าผู้ใช้กด Stop เอง ให้คงข้อความที่ stop worker ตั้งไว้ ไม่ทับด้วย "completed"
-        if self._stopping_in_progress:
-            self.progress_label.configure(text="Stopped", fg=STATUS_COLORS["idle"])
+        if stopped:
+            self._mark_dirty(self.progress_label, text="Stopped", fg=STATUS_COLORS["idle"])
         else:
-            self.progress_label.configure(text="Sequence Complete!", fg=STATUS_COLORS["success"])
-            self.timer_label.configure(text="00:00")
-            self.status_label.configure(
+            self._mark_dirty(self.progress_label, text="Sequence Complete!", fg=STATUS_COLORS["success"])
+            self._mark_dirty(self.timer_label, text="00:00")
+            self._mark_dirty(self.status_label,
                 text="Status: All operations completed!", fg=STATUS_COLORS["success"]
             )
 
         self._run_on_ui_thread(lambda: self.root.after(3000, self.reset_operation_colors))
-        self.draw_circuit_diagram()
         
     def reset_operation_colors(self):
-        """รีเซ็ตสี operation frames กลับเป็นปกติ"""
-        for key, color in OPERATION_FRAME_COLORS.items():
-            if key in self.operation_frames:
-                self.operation_frames[key].configure(bg=color)
-
-    def _wait_for_collection_threads(self, timeout=STOP_THREAD_JOIN_TIMEOUT_SEC):
-        """รอให้ ADC + BME280 collection threads จบงาน save (เรียกหลัง set stop_event แล้ว)"""
-        if self.data_collection_thread is not None and self.data_collection_thread.is_alive():
-            self.data_collection_thread.join(timeout=timeout)
-            if self.data_collection_thread.is_alive():
-                print("Warning: ADC data collection thread did not stop in time")
-        if self.bme_collection_thread is not None and self.bme_collection_thread.is_alive():
-            self.bme_collection_thread.join(timeout=timeout)
-            if self.bme_collection_thread.is_alive():
-                print("Warning: BME280 data collection thread did not stop in time")
-
-    def _stop_and_process_worker(self, mode):
-        """Background worker หลังกด Stop:
-        1) รอ collection threads save NPZ ให้เสร็จ
-        2) ประมวลผลข้อมูล (manual mode เท่านั้น)
-        3) คืน UI ผ่าน root.after เพื่อไม่บล็อก main thread
+        """รีเซ็ตสี operation frames กลับเป็นปกติ — เฉพาะ frame ที่ถูกเปลี่ยนสีตั้งแต่ reset ครั้งก่อน"""
+        styled, self._styled_ops = self._styled_ops, set()
+        frames = self.operation_frames
+        for op_key in styled:
+            self._cached_configure(frames[op_key], style=f'Op.{op_key}.TFrame')
+
+    def _when_collection_stopped(self, callback, timeout=STOP_THREAD_JOIN_TIMEOUT_SEC):
+        """เรียก callback บน UI thread ครั้งเดียว เมื่อ ADC + BME280 futures save เสร็จหรือครบ timeout
+
+        ไม่บล็อกอะไร — ใช้ done callback ของ future แทนการ join (เรียกหลัง set stop_event แล้ว)
         """
+        pending = [
+            f for f in (self.data_collection_future, self.bme_collection_future)
+            if self._is_running(f)
+        ]
+        self._when_futures_done(
+            pending, callback, timeout,
+            "Warning: data collection threads did not stop in time",
+        )
+
+    def _when_futures_done(self, futures, callback, timeout, timeout_message):
+        """เรียก callback บน UI thread ครั้งเดียว เมื่อ futures เสร็จครบหรือครบ timeout (พิมพ์ timeout_message)"""
+        pending = [f for f in futures if not f.done()]
+        state = {'fired': False, 'left': len(pending), 'timeout_id': None}
+
+        def fire(timed_out=False):
+            if state['fired']:
+                return
+            state['fired'] = True
+            if timed_out:
+                print(timeout_message)
+            elif state['timeout_id'] is not None:
+                self.root.after_cancel(state['timeout_id'])
+            callback()
+
+        def on_done(_future):
+            def countdown():
+                state['left'] -= 1
+                if state['left'] <= 0:
+                    fire()
+            self._run_on_ui_thread(countdown)
+
+        if not pending:
+            fire()
+            return
+        for future in pending:
+            future.add_done_callback(on_done)
+        state['timeout_id'] = self.root.after(int(timeout * 1000), lambda: fire(timed_out=True))
+
+    def _on_collection_stopped(self, mode):
+        """UI thread: collection หยุดแล้ว — manual ส่งงาน process เข้า _post_pool แล้วค่อย _finish_stop"""
+        if mode == "manual" and DATA_PROCESSING_AVAILABLE:
+            input_paths = {
+                'adc1263': self.data_collection_file_path,
+                'bme280': self.bme_collection_file_path,
+            }
+            future = self._post_pool.submit(self._process_manual_results, input_paths)
+            future.add_done_callback(
+                lambda _f: self._run_on_ui_thread(lambda: self._finish_stop(mode))
+            )
+            return
+        self._set_status_text("Status: Stopped", STATUS_COLORS["idle"])
+        self._show_progress(False)
+        self._finish_stop(mode)
+
+    def _process_manual_results(self, input_paths):
+        """ประมวลผล + cloud upload + ทำนาย ppm หลังกด Stop ใน manual mode (รันใน _post_pool)"""
         try:
-            self._set_status_text("Status: Saving data...", STATUS_COLORS["processing"])
-            self._wait_for_collection_threads(timeout=STOP_THREAD_JOIN_TIMEOUT_SEC)
-
-            if mode == "manual" and DATA_PROCESSING_AVAILABLE:
-                self._set_status_text("Status: Processing data...", STATUS_COLORS["processing"])
-                adc_npz = self.data_collection_file_path
-                bme_npz = self.bme_collection_file_path
-                ok, proc_paths = self._run_data_processing()
-                if ok:
-                    self._set_status_text(
-                        "Status: Data processing completed!", STATUS_COLORS["success"]
-                    )
-                    self._maybe_cloud_upload(adc_npz, bme_npz, proc_paths)
-                    self._run_methane_prediction(proc_paths)
-                    self._run_on_ui_thread(self._refresh_display_graph_if_visible)
-                else:
-                    self._set_status_text(
-                        "Status: Processing error (see console)", STATUS_COLORS["idle"]
-                    )
+            self._set_status_text("Status: Processing data...", STATUS_COLORS["processing"])
+            ok, proc_paths = self._run_data_processing(input_paths)
+            if ok:
+                self._set_status_text(
+                    "Status: Data processing completed!", STATUS_COLORS["success"]
+                )
+                self._maybe_cloud_upload(input_paths['adc1263'], input_paths['bme280'], proc_paths)
+                self._run_methane_prediction(proc_paths)
+                self._run_on_ui_thread(self._refresh_display_graph_if_visible)
             else:
-                self._set_status_text("Status: Stopped", STATUS_COLORS["idle"])
+                self._set_status_text(
+                    "Status: Processing error (see console)", STATUS_COLORS["idle"]
+                )
         except Exception as e:
             traceback.print_exc()
             self._set_status_text(
@@ -2521,38 +3163,30 @@ class HardwareControlGUI:
             )
         finally:
             self._show_progress(False)
-            self._run_on_ui_thread(lambda: self._finish_stop(mode))
 
     def _finish_stop(self, mode):
         """รันบน UI thread หลัง stop worker จบ — รีเซ็ตสถานะปุ่มและตัวแปร"""
         self._stopping_in_progress = False
-        self._stop_worker_thread = None
 
         # เคลียร์ manual timer refs
-        self.manual_timer_thread = None
+        self.manual_timer_future = None
         self.manual_timer_stop_event = None
         if hasattr(self, 'manual_timer_remaining_label'):
-            try:
-                self.manual_timer_remaining_label.configure(text="")
-            except tk.TclError:
-                pass
-
-        # คง Heater ไว้ถ้ายังเปิดอยู่ (Manual + Auto — สอดคล้องกับ _finalize_cycle_devices_and_processing)
-        preserve = []
-        if self.hardware.get_device_state('heater'):
-            preserve = ['heater']
+            self._mark_dirty(self.manual_timer_remaining_label, text="")
 
         # รักษาข้อความ status ที่ worker ตั้งล่าสุดไว้ (ส่ง None)
-        self._reset_ui_after_stop(mode, status_text=None, preserve_devices=preserve)
+        self._reset_ui_after_stop(mode, status_text=None)
 
     def stop_operation(self):
-        """หยุดการทำงาน — ไม่บล็อก main thread; ใช้ worker thread เพื่อรอ save + process"""
+        """หยุดการทำงาน — ไม่บล็อก main thread; รอ save ผ่าน future callbacks แล้ว process ใน _post_pool"""
         if self._stopping_in_progress:
             return
 
         mode = self.current_mode.get()
         was_running = self.running
         self.running = False
+        # auto sequence: ยกเลิก tick ที่รออยู่ทันที ไม่ต้องรอรอบถัดไปของ state machine
+        self._auto_finish()
 
         # ส่งสัญญาณให้ collection threads หยุดทันที (ไม่ join บน main thread)
         if self.stop_collection_event is not None:
@@ -2564,13 +3198,8 @@ class HardwareControlGUI:
             self.manual_timer_stop_event.set()
 
         if not was_running:
-            preserve = []
-            if self.hardware.get_device_state('heater'):
-                preserve = ['heater']
             self._reset_ui_after_stop(
-                mode, status_text="Status: Stopped",
-                status_color=STATUS_COLORS["idle"],
-                preserve_devices=preserve
+                mode, status_text="Status: Stopped", status_color=STATUS_COLORS["idle"]
             )
             return
 
@@ -2581,48 +3210,62 @@ class HardwareControlGUI:
         self._set_status_text("Status: Saving data...", STATUS_COLORS["processing"])
         self._show_progress(True)
 
-        # Auto mode: auto-sequence thread จะ finalize เอง — worker นี้แค่รอ save จบ
-        # Manual mode: worker รับผิดชอบทั้งรอ save + process + รีเซ็ต UI
-        self._stop_worker_thread = threading.Thread(
-            target=self._stop_and_process_worker,
-            args=(mode,),
-            daemon=True,
-        )
-        self._stop_worker_thread.start()
+        # Auto mode: state machine จบ sequence เอง (_auto_finish) — ที่นี่แค่รอ save จบ
+        # Manual mode: รอ save แล้ว process ใน _post_pool ก่อนรีเซ็ต UI
+        self._when_collection_stopped(lambda: self._on_collection_stopped(mode))
         
     def on_closing(self):
-        """Cleanup"""
+        """Cleanup — สั่งหยุดทุกอย่างแล้วรอ save ผ่าน future callbacks (ไม่ join บน UI thread)"""
+        if self._closing:
+            return
+        self._closing = True
         self.running = False
+        self._cancel_auto_tick()
         
-        # หยุดการเก็บข้อมูลถ้ากำลังรันอยู่
-        self._cleanup_collection_threads()
+        # หยุดการเก็บข้อมูลถ้ากำลังรันอยู่ — ปิดหน้าต่างจริงเมื่อ save เสร็จ (หรือครบ timeout)
+        if self.stop_collection_event is not None:
+            self.stop_collection_event.set()
+        if self.manual_timer_stop_event is not None:
+            self.manual_timer_stop_event.set()
+        self._when_collection_stopped(self._finish_closing)
+
+    def _finish_closing(self):
+        """UI thread: collection หยุดแล้ว — ปิด hardware, executors และหน้าต่าง"""
+        self._reset_collection_vars()
         
         # ใช้ Hardware Controller cleanup
         self.hardware.cleanup()
+        if self._ui_tick_id is not None:
+            self.root.after_cancel(self._ui_tick_id)
+        self._seq_pool.shutdown(wait=False, cancel_futures=True)
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        with self._collection_pool_lock:
+            self._collection_pool.shutdown(wait=False, cancel_futures=True)
+        self._process_pool.shutdown(wait=False, cancel_futures=True)
+        self._post_pool.shutdown(wait=False, cancel_futures=True)
             
         self.root.destroy()
 
 
 def main():
     """Main function"""
+    # อ่าน config คู่ขนานกับการสร้าง Tk root — HardwareControlGUI.__init__ ได้ค่าจาก cache
+    threading.Thread(target=load_config, name='config-preload', daemon=True).start()
     root = tk.Tk()
     
-    # แก้ปัญหา GUI ไม่สามารถคลิกได้เมื่อเปิดขึ้นมา
-    # ทำให้ window ได้ focus และอยู่ด้านบนก่อนสร้าง UI
-    root.update_idletasks()
-    root.lift()
-    root.attributes('-topmost', True)
-    root.update()
-    root.attributes('-topmost', False)
-    
     app = HardwareControlGUI(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     
-    # ทำให้ window ได้ focus อีกครั้งหลังจากสร้าง UI
-    root.update_idletasks()
-    root.focus_force()
-    root.deiconify()
-    
+    # แก้ปัญหา GUI ไม่สามารถคลิกได้เมื่อเปิดขึ้นมา
+    # ยก window ขึ้นบนสุด + focus หลัง mainloop เริ่ม (ไม่ต้อง pump event เองด้วย root.update())
+    def raise_window():
+        root.deiconify()
+        root.lift()
+        root.attributes('-topmost', True)
+        root.focus_force()
+        root.after(100, lambda: root.attributes('-topmost', False))
+
+    root.after(0, raise_window)
     root.mainloop()
 
 
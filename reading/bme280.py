@@ -64,6 +64,7 @@ except ImportError:
 BME_SAMPLE_INTERVAL_SEC = 0.1  # 1/0.1 = 10 Hz
 BME_I2C_ADDRESS = 0x76         # อาจเปลี่ยนเป็น 0x77 ตาม jumper ของบอร์ด
 BME_INITIAL_BUFFER_SIZE = 1000  # ~100 วินาทีของข้อมูลที่ 10 Hz
+BME_CHUNK_SIZE = 600            # ขนาด block ถัดไปเมื่อ buffer เต็ม (~60 วินาทีที่ 10 Hz)
 
 # คอลัมน์ของข้อมูล: [elapsed_time, temperature_c, humidity_pct, pressure_hpa]
 BME_COLUMN_NAMES = ['elapsed_time_sec', 'temperature_c', 'humidity_pct', 'pressure_hpa']
@@ -75,11 +76,12 @@ class BMESensorDataCollector:
 
     def __init__(self, buffer_size=BME_INITIAL_BUFFER_SIZE):
         self.num_channels = BME_NUM_CHANNELS
-        self.buffer_size = buffer_size
-        self.data = np.zeros((buffer_size, 1 + self.num_channels), dtype=np.float32)
-        self.index = 0
+        # เมื่อเต็มจะเพิ่ม block ใหม่ (ไม่ copy ข้อมูลเดิมแบบ vstack) แล้วต่อกันครั้งเดียวตอน save
+        self._chunks = [np.empty((buffer_size, 1 + self.num_channels), dtype=np.float32)]
+        self._chunk_pos = 0  # ตำแหน่งเขียนใน block ปัจจุบัน
+        self.index = 0       # จำนวน sample ทั้งหมด
         self.output_path = None
-        self.columns = list(BME_COLUMN_NAMES)
+        self.columns = np.array(BME_COLUMN_NAMES, dtype=np.str_)
 
     def prepare(self):
         """เตรียม output directory และชื่อไฟล์ bme280_YYYYMMDD_HHMMSS.npz"""
@@ -89,16 +91,32 @@ class BMESensorDataCollector:
         self.output_path = output_dir / f"bme280_{date_time}.npz"
         return self.output_path
 
-    def append(self, elapsed_time, values):
-        """เพิ่มข้อมูล 1 แถว (values = [temp, humidity, pressure])"""
-        if self.index >= self.buffer_size:
-            new_buffer = np.zeros((self.buffer_size, 1 + self.num_channels), dtype=np.float32)
-            self.data = np.vstack([self.data, new_buffer])
-            self.buffer_size *= 2
+    def next_row(self):
+        """จองแถวถัดไปใน buffer แล้วคืน view ให้ผู้เรียกเขียน [elapsed, T, H, P] ลงไปตรงๆ"""
+        block = self._chunks[-1]
+        if self._chunk_pos >= block.shape[0]:
+            block = np.empty((BME_CHUNK_SIZE, 1 + self.num_channels), dtype=np.float32)
+            self._chunks.append(block)
+            self._chunk_pos = 0
 
-        self.data[self.index, 0] = elapsed_time
-        self.data[self.index, 1:] = values
+        row = block[self._chunk_pos]
+        self._chunk_pos += 1
         self.index += 1
+        return row
+
+    def append(self, elapsed_time, values):
+        """เพิ่มข้อมูล 1 แถว (values = [temp, humidity, pressure])"""
+        row = self.next_row()
+        row[0] = elapsed_time
+        row[1:] = values
+
+    @property
+    def data(self):
+        """ข้อมูลที่เก็บแล้วทั้งหมด (index แถว) — block เดียวคืน view, หลาย block ต่อกันครั้งเดียว"""
+        filled = self._chunks[:-1] + [self._chunks[-1][:self._chunk_pos]]
+        if len(filled) == 1:
+            return filled[0]
+        return np.concatenate(filled)
 
     def save(self):
         """บันทึกข้อมูลเป็นไฟล์ .npz (ไม่บีบอัด — เพิ่มความเร็วตอนกด Stop)"""
@@ -106,7 +124,7 @@ class BMESensorDataCollector:
             print("No BME280 data to save")
             return None
 
-        final_data = self.data[:self.index]
+        final_data = self.data
 
         # np.savez (uncompressed) เร็วกว่า savez_compressed มากบนข้อมูลขนาดใหญ่
         np.savez(
@@ -155,31 +173,29 @@ def run_bme_collection(stop_event: threading.Event, simulate: Optional[bool] = N
         start_time = time.perf_counter()
         next_sample_time = start_time
         sample_count = 0
+        prev_row = None
+        stop_requested = stop_event.is_set
 
-        while not stop_event.is_set():
+        while not stop_requested():
             loop_start = time.perf_counter()
             elapsed_time = loop_start - start_time
 
+            # เขียนลงแถวของ collector ตรงๆ — ไม่สร้าง list values ใหม่ทุก sample
+            row = collector.next_row()
+            row[0] = elapsed_time
             try:
-                values = [
-                    float(sensor.temperature),
-                    float(sensor.humidity),
-                    float(sensor.pressure),
-                ]
+                row[1] = sensor.temperature
+                row[2] = sensor.humidity
+                row[3] = sensor.pressure
             except Exception as e:
                 # ถ้าอ่านพลาด ใช้ค่าเดิมแทน 0 เพื่อไม่ให้กราฟกระโดด
                 print(f"BME280 read error: {e}")
-                if collector.index > 0:
-                    last = collector.data[collector.index - 1, 1:]
-                    values = [float(last[0]), float(last[1]), float(last[2])]
-                else:
-                    values = [0.0, 0.0, 0.0]
-
-            collector.append(elapsed_time, values)
+                row[1:] = prev_row[1:] if prev_row is not None else 0.0
+            prev_row = row
             sample_count += 1
 
             if sample_count % 50 == 0:
-                t_v, h_v, p_v = values
+                t_v, h_v, p_v = row[1:]
                 print(
                     f"BME t={elapsed_time:.2f}s | {sample_count} samples | "
                     f"T={t_v:.2f}C H={h_v:.2f}% P={p_v:.2f}hPa"
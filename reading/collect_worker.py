@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Collection Worker
+=================
+ฟังก์ชันที่รันใน collection process (ProcessPoolExecutor แบบ spawn ของ gui.py)
+แยกออกจาก gui.py เพื่อให้ child process ไม่ต้อง import Tk / matplotlib / pandas
+import ได้เฉพาะ stdlib — reading.main / reading.bme280 ถูก import ตอน initializer
+
+Author: eNose Project
+"""
+
+import signal
+import threading
+from importlib import import_module
+
+# kind -> (module, ชื่อฟังก์ชันเก็บข้อมูล) ที่ collection process ใช้
+COLLECTOR_SOURCES = {
+    'adc': ('reading.main', 'run_collection'),
+    'bme': ('reading.bme280', 'run_bme_collection'),
+}
+
+
+class CollectionStop:
+    """stop event ที่ใช้ข้าม process — ถือว่า set เมื่อ generation ที่แชร์เปลี่ยนจากตอนเริ่มเก็บ
+
+    run_collection / run_bme_collection ใช้แค่ is_set()/set() จึงใช้แทน threading.Event ได้
+    is_set() เป็นแค่การอ่าน int จาก shared memory (Value สร้างด้วย lock=False) — ไม่มี lock/condition ในลูปเก็บข้อมูล
+    การเก็บแต่ละรอบได้ generation ของตัวเอง — หยุดรอบก่อนแล้วไม่มีทางไปปลุก collector เก่า
+    set() ถูกเรียกเฉพาะฝั่ง GUI process (UI thread + _seq_pool) — อ่านแล้วบวกค่าเป็น 2 ขั้น จึงล็อกด้วย _set_lock
+    """
+    __slots__ = ('_shared', 'generation')
+    _set_lock = threading.Lock()
+
+    def __init__(self, shared, generation):
+        self._shared = shared
+        self.generation = generation
+
+    def set(self):
+        with self._set_lock:
+            if self._shared.value == self.generation:
+                self._shared.value += 1
+
+    def is_set(self):
+        return self._shared.value != self.generation
+
+
+_collection_generation = None  # shared Value ใน collection process (ตั้งโดย initializer)
+_collectors = {}  # kind -> ฟังก์ชันเก็บข้อมูล (import ครั้งเดียวต่อ process แล้วใช้ซ้ำทุก cycle)
+
+
+def _load_collector(kind):
+    """import ฟังก์ชันเก็บข้อมูลของ kind แล้ว cache ไว้ใน _collectors"""
+    module_name, func_name = COLLECTOR_SOURCES[kind]
+    collect = _collectors[kind] = getattr(import_module(module_name), func_name)
+    return collect
+
+
+def init_collection_worker(generation):
+    """initializer ของ collection process — รับ shared generation, ไม่รับ Ctrl+C (parent สั่งหยุดเอง)
+
+    import collector ทุกตัวไว้ก่อนเลย (numpy, driver, numba) — cycle แรกเริ่มเก็บได้ทันทีตอนกด Start
+    """
+    global _collection_generation
+    _collection_generation = generation
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for kind in COLLECTOR_SOURCES:
+        try:
+            _load_collector(kind)
+        except Exception as e:
+            # ไม่มี sensor/library บนเครื่องนี้ — collect_in_worker จะ import ซ้ำและแจ้ง error ตอนใช้จริง
+            print(f"Collection worker: {kind} collector unavailable: {e}")
+
+
+def warm_up():
+    """งานเปล่าที่ส่งเข้า pool ตอนสร้าง — บังคับให้ spawn process (และรัน initializer) ก่อนกด Start"""
+    return None
+
+
+def collect_in_worker(kind, generation):
+    """รันใน collection process: เก็บข้อมูลจนกว่า generation เปลี่ยน คืน path ไฟล์ที่บันทึก"""
+    collect = _collectors.get(kind)
+    if collect is None:
+        collect = _load_collector(kind)
+    return collect(CollectionStop(_collection_generation, generation))
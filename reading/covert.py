@@ -10,11 +10,57 @@ Author: eNose Project
 """
 
 import numpy as np
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import multiprocessing
 from pathlib import Path
+import struct
 import sys
 import tkinter as tk
 from tkinter import filedialog
+import zipfile
+
+# รูปแบบตัวเลขใน CSV — float32 ต้องใช้ 9 หลักนัยสำคัญจึงอ่านกลับได้ค่าเดิมตรงกับใน npz
+CSV_FLOAT_FORMAT = '%.9g'
+
+
+def load_npz_array_mmap(npz_path, name):
+    """
+    เปิด array ใน npz แบบ memory-map (read-only) ถ้าเป็นไฟล์ที่ไม่บีบอัด
+    
+    np.load(..., mmap_mode='r') ไม่ map ไฟล์ npz ให้ — จึงหา offset ของ <name>.npy ใน zip เอง
+    OS อ่านข้อมูลจากดิสก์ทีละ page ตอนเขียน CSV แทนการโหลดทั้งก้อนเข้า RAM
+    npz ที่บีบอัด (เช่นไฟล์เก่าจาก savez_compressed) จะ fallback เป็น np.load ปกติ
+    
+    Args:
+        npz_path (Path): path ของไฟล์ npz
+        name (str): ชื่อ array ใน npz (เช่น 'data')
+    
+    Returns:
+        np.ndarray: np.memmap หรือ array ที่โหลดเต็ม
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        info = zf.getinfo(name + '.npy')
+    
+    if info.compress_type == zipfile.ZIP_STORED:
+        with open(npz_path, 'rb') as f:
+            # local file header: 30 bytes + ชื่อไฟล์ + extra field (ความยาวอาจต่างจาก central directory)
+            f.seek(info.header_offset)
+            name_len, extra_len = struct.unpack('<HH', f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+        
+        if not dtype.hasobject and all(shape):
+            return np.memmap(npz_path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                             order='F' if fortran_order else 'C')
+    
+    with np.load(npz_path) as npz_data:
+        return npz_data[name]
 
 
 def convert_npz_to_csv(npz_path, output_dir):
@@ -29,25 +75,22 @@ def convert_npz_to_csv(npz_path, output_dir):
         Path หรือ None: path ของไฟล์ CSV ที่สร้างขึ้น หรือ None ถ้าเกิดข้อผิดพลาด
     """
     try:
-        # โหลดข้อมูลจากไฟล์ npz
-        npz_data = np.load(npz_path)
-        
-        # ดึงข้อมูลออกมา
-        data = npz_data['data']
-        columns = npz_data['columns']
-        
-        # สร้าง DataFrame จากข้อมูล
-        df = pd.DataFrame(data, columns=columns)
-        
         # สร้างชื่อไฟล์ CSV จากชื่อไฟล์ npz (เปลี่ยนนามสกุลเป็น .csv)
         csv_filename = npz_path.stem + '.csv'
         csv_path = output_dir / csv_filename
         
-        # บันทึกเป็น CSV
-        df.to_csv(csv_path, index=False)
+        # โหลดข้อมูลจากไฟล์ npz แล้วเขียน CSV ตรงจาก array
+        # ไม่สร้าง pandas DataFrame (ไม่ copy ข้อมูลทั้งก้อนอีกรอบ + เขียนเร็วกว่า to_csv มาก)
+        with np.load(npz_path) as npz_data:
+            columns = npz_data['columns']
+        data = load_npz_array_mmap(npz_path, 'data')
+        
+        with open(csv_path, 'w', newline='') as f:
+            f.write(','.join(str(c) for c in columns) + '\n')
+            np.savetxt(f, data, delimiter=',', fmt=CSV_FLOAT_FORMAT)
         
         print(f"✓ แปลงสำเร็จ: {npz_path.name} -> {csv_filename}")
-        print(f"  จำนวนแถว: {len(df)}, จำนวนคอลัมน์: {len(df.columns)}")
+        print(f"  จำนวนแถว: {data.shape[0]}, จำนวนคอลัมน์: {len(columns)}")
         
         return csv_path
         
@@ -98,10 +141,15 @@ def convert_all_npz_files(data_dir=None, output_dir=None):
     
     print(f"\nพบไฟล์ .npz ทั้งหมด {len(npz_files)} ไฟล์\n")
     
-    # แปลงไฟล์ทีละไฟล์
+    # แปลงหลายไฟล์พร้อมกันใน process แยก (อ่าน npz + format ตัวเลขเป็น CPU-bound ไม่ติด GIL)
     converted_files = []
-    for npz_file in npz_files:
-        csv_path = convert_npz_to_csv(npz_file, output_dir)
+    if len(npz_files) == 1:
+        results = [convert_npz_to_csv(npz_files[0], output_dir)]
+    else:
+        # spawn — ไม่ fork process ที่อาจมี hidden Tk root (_dialog_root) เปิดค้างอยู่
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(convert_npz_to_csv, npz_files, repeat(output_dir)))
+    for csv_path in results:
         if csv_path:
             converted_files.append(csv_path)
     
@@ -111,6 +159,29 @@ def convert_all_npz_files(data_dir=None, output_dir=None):
     return converted_files
 
 
+_dialog_root = None  # hidden Tk root ที่ dialog ทุกตัวใช้ร่วมกัน (สร้างครั้งแรกที่เปิด dialog)
+
+
+def _get_dialog_root():
+    """คืน hidden Tk root ร่วม — สร้าง Tk() ครั้งเดียวแทนการสร้าง/destroy ใหม่ทุก dialog"""
+    global _dialog_root
+    if _dialog_root is None:
+        _dialog_root = tk.Tk()
+        _dialog_root.withdraw()  # ซ่อนหน้าต่างหลัก
+    return _dialog_root
+
+
+def _destroy_dialog_root():
+    """destroy hidden Tk root ร่วม (ถ้าเคยสร้าง)"""
+    global _dialog_root
+    if _dialog_root is not None:
+        try:
+            _dialog_root.destroy()
+        except tk.TclError:
+            pass
+        _dialog_root = None
+
+
 def select_file_dialog():
     """
     เปิด dialog สำหรับเลือกไฟล์ npz
@@ -119,15 +190,14 @@ def select_file_dialog():
         Path หรือ None: path ของไฟล์ที่เลือก หรือ None ถ้ายกเลิก
     """
     try:
-        root = tk.Tk()
-        root.withdraw()  # ซ่อนหน้าต่างหลัก
+        root = _get_dialog_root()
         
         # ทำให้ window ได้ focus และอยู่ด้านบน (สำคัญสำหรับ Windows)
         root.update_idletasks()
         root.lift()
         root.attributes('-topmost', True)
         root.focus_force()
-        root.update()
+        root.update_idletasks()  # ไม่ใช้ update() — ไม่ต้อง re-enter event loop แค่ให้ wm ตั้งค่าก่อนเปิด dialog
         root.attributes('-topmost', False)
         
         # เรียก dialog
@@ -137,8 +207,6 @@ def select_file_dialog():
             filetypes=[("NPZ files", "*.npz"), ("All files", "*.*")]
         )
         
-        root.destroy()
-        
         if file_path:
             return Path(file_path)
         return None
@@ -159,15 +227,14 @@ def select_output_folder_dialog(initial_dir=None):
         Path หรือ None: path ของโฟลเดอร์ที่เลือก หรือ None ถ้ายกเลิก
     """
     try:
-        root = tk.Tk()
-        root.withdraw()  # ซ่อนหน้าต่างหลัก
+        root = _get_dialog_root()
         
         # ทำให้ window ได้ focus และอยู่ด้านบน (สำคัญสำหรับ Windows)
         root.update_idletasks()
         root.lift()
         root.attributes('-topmost', True)
         root.focus_force()
-        root.update()
+        root.update_idletasks()  # ไม่ใช้ update() — ไม่ต้อง re-enter event loop แค่ให้ wm ตั้งค่าก่อนเปิด dialog
         root.attributes('-topmost', False)
         
         # เรียก dialog
@@ -177,8 +244,6 @@ def select_output_folder_dialog(initial_dir=None):
             initialdir=initial_dir
         )
         
-        root.destroy()
-        
         if folder_path:
             return Path(folder_path)
         return None
@@ -190,6 +255,14 @@ def select_output_folder_dialog(initial_dir=None):
 
 def main():
     """ฟังก์ชันหลักสำหรับรันสคริปต์"""
+    try:
+        _run()
+    finally:
+        _destroy_dialog_root()
+
+
+def _run():
+    """เลือก input/output (จาก arguments หรือ dialog) แล้วแปลงไฟล์"""
     print("=" * 60)
     print("NPZ to CSV Converter")
     print("=" * 60)
@@ -14,6 +14,7 @@ import time
 import signal
 import sys
 import threading
+import zipfile
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -26,46 +27,101 @@ except ImportError:
     ADS1263 = None
     print("ADS1263 not found - ADC collection disabled")
 
+# numba (optional) — JIT kernel แปลง raw → โวลต์ของแต่ละ batch ถ้าไม่มีใช้ NumPy แทน
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # ==================== CONFIGURATION ====================
 REF = 5.08  
 CHANNEL_LIST = [0, 1, 2, 3]
 SAMPLE_INTERVAL_SEC = 0.01  # 1/0.01 = 100 Hz
+SAMPLE_INTERVAL_NS = round(SAMPLE_INTERVAL_SEC * 1e9)  # จังหวะ sample แบบ int (ns) — ไม่สะสม error ของ float
+SPIN_TAIL_NS = 200_000  # ตื่นจาก sleep ก่อน deadline เท่านี้แล้ว spin ต่อ (time.sleep บน Pi มักตื่นช้า 50–100 µs)
 ADC_SAMPLE_RATE = 'ADS1263_14400SPS'
 INITIAL_BUFFER_SIZE = 1000  # Pre-allocate buffer for ~100 seconds of data
+CHUNK_SIZE = 6000  # ขนาด block ถัดไปเมื่อ buffer เต็ม (~60 วินาทีที่ 100 Hz)
+BATCH_SIZE = 10  # จำนวน sample ที่รวบแปลง + เขียนลง buffer ต่อครั้ง (0.1 วินาทีที่ 100 Hz)
+# ตัวคูณแปลงค่า raw (signed 32-bit) เป็นโวลต์ — ใช้แปลงทุก channel ในการคูณ NumPy ครั้งเดียว
+VOLTS_PER_COUNT = REF / 0x7FFFFFFF
 
 class SensorDataCollector:
     """Class for collecting and storing sensor data using NumPy"""
     
     def __init__(self, num_channels, buffer_size=INITIAL_BUFFER_SIZE):
         self.num_channels = num_channels
-        self.buffer_size = buffer_size
         # Pre-allocate buffer: [elapsed_time, ch0, ch1, ..., ch9]
-        self.data = np.zeros((buffer_size, 1 + num_channels), dtype=np.float32)
-        self.index = 0
+        # เมื่อเต็มจะเพิ่ม block ใหม่ (ไม่ copy ข้อมูลเดิมแบบ vstack) แล้วต่อกันครั้งเดียวตอน save
+        self._chunks = [np.empty((buffer_size, 1 + num_channels), dtype=np.float32)]
+        self._chunk_pos = 0  # ตำแหน่งเขียนใน block ปัจจุบัน
+        self.index = 0       # จำนวน sample ทั้งหมด
         self.output_path = None
     
     def prepare(self, channel_list):
         """Prepare output directory and filename"""
-        output_dir = Path(__file__).parent / "data"
-        output_dir.mkdir(parents=True, exist_ok=True)
         # ใช้รูปแบบ adc1263_date_time
         date_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # ชื่อคอลัมน์เป็น array dtype unicode คงที่ — บันทึกลง npz ได้ตรงๆ โหลดกลับไม่ต้อง pickle
+        self.columns = np.array(
+            ['elapsed_time_sec'] + [f"ss{i+1}" for i in range(len(channel_list))], dtype=np.str_)
+        output_dir = Path(__file__).parent / "data"
+        output_dir.mkdir(parents=True, exist_ok=True)
         self.output_path = output_dir / f"adc1263_{date_time}.npz"
-        self.columns = ['elapsed_time_sec'] + [f"ss{i+1}" for i in range(len(channel_list))]
         return self.output_path
     
-    def append(self, elapsed_time, voltages):
-        """Append a single row of data"""
-        # Expand buffer if needed
-        if self.index >= self.buffer_size:
-            new_buffer = np.zeros((self.buffer_size, 1 + self.num_channels), dtype=np.float32)
-            self.data = np.vstack([self.data, new_buffer])
-            self.buffer_size *= 2
+    def next_row(self):
+        """จองแถวถัดไปใน buffer แล้วคืน view (float32) ให้ผู้เรียกเขียนค่าลงไปตรงๆ
+
+        ไม่ต้องสร้าง list/array ชั่วคราวต่อ sample — row[0] = elapsed_time, row[1:] = voltages
+        """
+        block = self._chunks[-1]
+        if self._chunk_pos >= block.shape[0]:
+            block = np.empty((CHUNK_SIZE, 1 + self.num_channels), dtype=np.float32)
+            self._chunks.append(block)
+            self._chunk_pos = 0
         
-        # Store data
-        self.data[self.index, 0] = elapsed_time
-        self.data[self.index, 1:] = voltages
+        row = block[self._chunk_pos]
+        self._chunk_pos += 1
         self.index += 1
+        return row
+
+    def append(self, elapsed_time, voltages):
+        """Append a single row of data"""
+        row = self.next_row()
+        row[0] = elapsed_time
+        row[1:] = voltages
+
+    def append_batch(self, elapsed_times, voltages):
+        """Append หลายแถวด้วย slice assignment — voltages shape (n, num_channels)"""
+        total = len(elapsed_times)
+        done = 0
+        while done < total:
+            block = self._chunks[-1]
+            if self._chunk_pos >= block.shape[0]:
+                block = np.empty((CHUNK_SIZE, 1 + self.num_channels), dtype=np.float32)
+                self._chunks.append(block)
+                self._chunk_pos = 0
+            take = min(total - done, block.shape[0] - self._chunk_pos)
+            rows = block[self._chunk_pos:self._chunk_pos + take]
+            rows[:, 0] = elapsed_times[done:done + take]
+            rows[:, 1:] = voltages[done:done + take]
+            self._chunk_pos += take
+            done += take
+        self.index += total
+
+    def _filled_chunks(self):
+        """block ที่มีข้อมูล (block สุดท้ายตัดเหลือเฉพาะแถวที่เขียนแล้ว)"""
+        return self._chunks[:-1] + [self._chunks[-1][:self._chunk_pos]]
+
+    @property
+    def data(self):
+        """ข้อมูลที่เก็บแล้วทั้งหมด (index แถว) — block เดียวคืน view, หลาย block ต่อกันครั้งเดียว"""
+        filled = self._filled_chunks()
+        if len(filled) == 1:
+            return filled[0]
+        return np.concatenate(filled)
     
     def save(self):
         """Save collected data to .npz file (uncompressed สำหรับความเร็วในการ stop)"""
@@ -73,13 +129,12 @@ class SensorDataCollector:
             print("No data to save")
             return None
 
-        final_data = self.data[:self.index]
-
-        # ใช้ np.savez (ไม่บีบอัด) เพื่อให้การหยุดเก็บข้อมูลเร็วที่สุด
+        # ไม่บีบอัด (เหมือน np.savez) เพื่อให้การหยุดเก็บข้อมูลเร็วที่สุด
         # — บีบอัดทำให้ใช้ CPU มากบน Raspberry Pi ส่งผลให้กดหยุดแล้วรู้สึกค้างนาน
-        np.savez(
+        # และเขียน data จาก block ตรงๆ ไม่ต้อง concatenate ทั้งก้อนก่อน (ไม่ copy ข้อมูลทั้งหมดอีกรอบ)
+        savez_chunks(
             self.output_path,
-            data=final_data,
+            self._filled_chunks(),
             columns=self.columns,
             sample_rate=1.0 / SAMPLE_INTERVAL_SEC,
             num_channels=self.num_channels
@@ -90,6 +145,32 @@ class SensorDataCollector:
         return self.output_path
 
 
+def savez_chunks(path, chunks, **arrays):
+    """บันทึก .npz แบบเดียวกับ np.savez โดย data คือ chunks (2-D, คอลัมน์เท่ากัน) ต่อกันตามลำดับ
+
+    เขียน header ของ data.npy ด้วย shape รวมแล้วเขียนแต่ละ block ต่อท้าย — np.load อ่านได้ตามปกติ
+    chunks ว่าง (ไม่มี block) บันทึก data เป็น array float32 shape (0, 0)
+    """
+    if chunks:
+        dtype, num_cols = chunks[0].dtype, chunks[0].shape[1]
+    else:
+        dtype, num_cols = np.dtype(np.float32), 0
+    rows = sum(chunk.shape[0] for chunk in chunks)
+    header = {
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': (rows, num_cols),
+    }
+    with zipfile.ZipFile(path, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        with zf.open('data.npy', mode='w', force_zip64=True) as f:
+            np.lib.format.write_array_header_1_0(f, header)
+            for chunk in chunks:
+                f.write(np.ascontiguousarray(chunk).data)
+        for name, value in arrays.items():
+            with zf.open(f'{name}.npy', mode='w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(value), allow_pickle=False)
+
+
 def raw_to_voltage(raw_value):
     """Convert raw ADC value to voltage"""
     if raw_value & 0x80000000:
@@ -97,6 +178,33 @@ def raw_to_voltage(raw_value):
     return raw_value * REF / 0x7FFFFFFF
 
 
+def _scale_counts_numpy(raw, out):
+    """out[...] = raw * VOLTS_PER_COUNT ด้วย NumPy (ใช้เมื่อไม่มี numba)"""
+    np.multiply(raw, VOLTS_PER_COUNT, out=out)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _scale_counts_jit(raw, out):
+        """out[...] = raw * VOLTS_PER_COUNT — loop เดียวที่ compile แล้ว ไม่มี dispatch ของ NumPy ต่อ batch"""
+        for idx in np.ndindex(raw.shape):
+            out[idx] = raw[idx] * VOLTS_PER_COUNT
+
+    _scale_counts = _scale_counts_jit
+else:
+    _scale_counts = _scale_counts_numpy
+
+
+def raw_to_voltages(raw_values, out):
+    """แปลง raw ADC ทุก channel เป็นโวลต์ลง out (float32) ในครั้งเดียว — ผลเหมือน raw_to_voltage ราย channel
+
+    raw เป็น unsigned 32-bit จาก ADS1263_GetAll — view เป็น int32 ได้ two's complement ทันที
+    """
+    raw = np.asarray(raw_values, dtype=np.uint32).view(np.int32)
+    _scale_counts(raw, out)
+    return out
+
+
 def run_collection(stop_event: threading.Event, simulate: Optional[bool] = None):
     """
     รันการเก็บข้อมูลจนกว่า stop_event จะถูก set
@@ -108,6 +216,7 @@ def run_collection(stop_event: threading.Event, simulate: Optional[bool] = None)
     """
     adc = None
     collector = None
+    pending = 0
     try:
         if simulate:
             print("Simulation mode is disabled. ADC collection aborted.")
@@ -123,42 +232,57 @@ def run_collection(stop_event: threading.Event, simulate: Optional[bool] = None)
         adc.ADS1263_SetMode(0)
         print("ADC initialized successfully")
 
-        collector = SensorDataCollector(num_channels=len(CHANNEL_LIST))
+        num_channels = len(CHANNEL_LIST)
+        collector = SensorDataCollector(num_channels=num_channels)
         output_path = collector.prepare(CHANNEL_LIST)
         print(f"Recording data to: {output_path}")
 
-        start_time = time.perf_counter()
-        next_sample_time = start_time
-        sample_count = 0
+        # scratch ของ 1 batch — อ่าน ADC ทีละ sample ตามจังหวะเดิม แต่แปลง + เขียน buffer ครั้งละ BATCH_SIZE
+        raw_batch = np.empty((BATCH_SIZE, num_channels), dtype=np.uint32)
+        time_batch = np.empty(BATCH_SIZE, dtype=np.float64)
+        volt_batch = np.empty((BATCH_SIZE, num_channels), dtype=np.float32)
+        pending = 0
+        # เรียกครั้งแรกนอกลูป — numba compile/โหลด cache ใช้เวลาหลายร้อย ms ไม่ให้ไปตกกับ batch แรกที่จับเวลาอยู่
+        raw_batch.fill(0)
+        raw_to_voltages(raw_batch, volt_batch)
 
-        while not stop_event.is_set():
-            loop_start = time.perf_counter()
+        perf_ns = time.perf_counter_ns
+        start_ns = perf_ns()
+        next_ns = start_ns
+        sample_count = 0
+        # bound method ครั้งเดียว — เช็ค stop ทุก sample เหลือแค่การอ่าน flag ไม่ต้อง lookup ซ้ำ
+        stop_requested = stop_event.is_set
 
-            raw_values = adc.ADS1263_GetAll(CHANNEL_LIST)
-            voltages = []
-            for index, channel in enumerate(CHANNEL_LIST):
-                raw_value = raw_values[index]
-                voltage = raw_to_voltage(raw_value)
-                voltages.append(voltage)
+        while not stop_requested():
+            loop_ns = perf_ns()
 
-            elapsed_time = loop_start - start_time
+            raw_batch[pending] = adc.ADS1263_GetAll(CHANNEL_LIST)
+            time_batch[pending] = (loop_ns - start_ns) / 1e9
+            pending += 1
 
-            collector.append(elapsed_time, voltages)
-            sample_count += 1
+            if pending == BATCH_SIZE:
+                raw_to_voltages(raw_batch, volt_batch)
+                collector.append_batch(time_batch, volt_batch)
+                pending = 0
+                sample_count += BATCH_SIZE
 
-            if sample_count % 100 == 0:
-                voltage_text = " ".join(
-                    f"CH{ch}={v:.4f}V" for ch, v in zip(CHANNEL_LIST[:3], voltages[:3])
-                )
-                print(f"t={elapsed_time:.2f}s | {sample_count} samples | {voltage_text} ...")
+                if sample_count % 100 == 0:
+                    voltage_text = " ".join(
+                        f"CH{ch}={v:.4f}V" for ch, v in zip(CHANNEL_LIST[:3], volt_batch[-1, :3])
+                    )
+                    print(f"t={time_batch[-1]:.2f}s | {sample_count} samples | {voltage_text} ...")
 
-            next_sample_time += SAMPLE_INTERVAL_SEC
-            now = time.perf_counter()
-            sleep_time = next_sample_time - now
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # deadline ถัดไปนับจาก start_ns ด้วย int — sleep ส่วนใหญ่ แล้ว spin ช่วงท้ายให้ตรงเวลา
+            next_ns += SAMPLE_INTERVAL_NS
+            remaining = next_ns - perf_ns()
+            if remaining > 0:
+                if remaining > SPIN_TAIL_NS:
+                    time.sleep((remaining - SPIN_TAIL_NS) / 1e9)
+                while perf_ns() < next_ns:
+                    pass
             else:
-                next_sample_time = now
+                # ช้ากว่ากำหนด — เริ่มนับจังหวะใหม่จากตอนนี้ (ไม่ยิง sample ติดกันเพื่อไล่ตาม)
+                next_ns = perf_ns()
 
         print("\nStopping data collection...")
 
@@ -171,6 +295,10 @@ def run_collection(stop_event: threading.Event, simulate: Optional[bool] = None)
     finally:
         saved_path = None
         if collector is not None:
+            if pending:
+                # sample ที่ค้างใน batch สุดท้าย (หยุดกลาง batch)
+                raw_to_voltages(raw_batch[:pending], volt_batch[:pending])
+                collector.append_batch(time_batch[:pending], volt_batch[:pending])
             saved_path = collector.save()
         if adc is not None and ON_RASPBERRY_PI:
             adc.ADS1263_Exit()
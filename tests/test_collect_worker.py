@@ -0,0 +1,77 @@
+"""Tests for the cross-process stop flag in reading/collect_worker.py."""
+from __future__ import annotations
+
+import multiprocessing
+import unittest
+from unittest import mock
+
+from reading import collect_worker
+from reading.collect_worker import CollectionStop
+
+
+def _shared_generation():
+    return multiprocessing.get_context("spawn").Value("i", 0, lock=False)
+
+
+class TestCollectionStop(unittest.TestCase):
+    def test_set_and_is_set(self):
+        shared = _shared_generation()
+        stop = CollectionStop(shared, shared.value)
+        self.assertFalse(stop.is_set())
+
+        stop.set()
+        self.assertTrue(stop.is_set())
+        self.assertEqual(shared.value, 1)
+
+        # set ซ้ำไม่เลื่อน generation อีก
+        stop.set()
+        self.assertTrue(stop.is_set())
+        self.assertEqual(shared.value, 1)
+
+    def test_stale_stop_never_stops_newer_generation(self):
+        shared = _shared_generation()
+        old = CollectionStop(shared, shared.value)
+        old.set()
+
+        new = CollectionStop(shared, shared.value)
+        self.assertFalse(new.is_set())
+
+        # stop ของรอบก่อนถูกเรียกซ้ำ (เช่น _stop_data_collection มาช้า) — รอบใหม่ต้องยังเก็บต่อ
+        old.set()
+        self.assertFalse(new.is_set())
+        self.assertTrue(old.is_set())
+
+        new.set()
+        self.assertTrue(new.is_set())
+        self.assertTrue(old.is_set())
+
+    def test_copies_in_other_process_see_the_same_generation(self):
+        shared = _shared_generation()
+        stop = CollectionStop(shared, shared.value)
+        # collection process สร้าง stop ของตัวเองจาก generation ที่ได้รับ (ไม่ใช่ตัวเดียวกับฝั่ง GUI)
+        worker_side = CollectionStop(shared, stop.generation)
+        stop.set()
+        self.assertTrue(worker_side.is_set())
+
+
+class TestCollectInWorker(unittest.TestCase):
+    def test_passes_stop_for_requested_generation(self):
+        shared = _shared_generation()
+        shared.value = 5
+        seen = []
+
+        def fake_collect(stop_event):
+            seen.append((stop_event.generation, stop_event.is_set()))
+            return "saved.npz"
+
+        with mock.patch.object(collect_worker, "_collection_generation", shared), \
+                mock.patch.dict(collect_worker._collectors, {"adc": fake_collect}):
+            self.assertEqual(collect_worker.collect_in_worker("adc", 5), "saved.npz")
+            # generation เก่า = ถูกหยุดไปแล้ว collector ต้องเห็นทันที
+            collect_worker.collect_in_worker("adc", 4)
+
+        self.assertEqual(seen, [(5, False), (4, True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
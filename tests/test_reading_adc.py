@@ -0,0 +1,102 @@
+"""Tests for ADC raw→voltage conversion in reading/main.py."""
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from reading import main as adc_main
+
+
+class TestRawToVoltages(unittest.TestCase):
+    def _raw_batch(self):
+        # ครอบคลุมช่วงลบ (0x80000000 ขึ้นไป) และค่าขอบ ของ BATCH_SIZE x 4 channel
+        raw = np.array(
+            [0, 1, 0x7FFFFFFF, 0x80000000, 0x80000001, 0xFFFFFFFE, 0xFFFFFFFF, 0x12345678,
+             0x9ABCDEF0, 0x40000000],
+            dtype=np.uint32,
+        )
+        return np.tile(raw, (4, 1)).T.copy()
+
+    def test_matches_scalar_raw_to_voltage(self):
+        raw = np.array([0, 0x7FFFFFFF, 0x80000000, 0xFFFFFFFF], dtype=np.uint32)
+        out = np.empty(raw.shape, dtype=np.float32)
+        adc_main.raw_to_voltages(raw, out)
+
+        for value, volts in zip(raw.tolist(), out.tolist()):
+            self.assertEqual(volts, float(np.float32(adc_main.raw_to_voltage(value))), hex(value))
+        # ค่าขอบที่รู้ผลแน่นอน: 0 → 0 V, 0xFFFFFFFF = -1 count, 0x80000000 = ลบสุด
+        self.assertEqual(out[0], 0.0)
+        self.assertLess(out[2], 0.0)
+        self.assertLess(out[3], 0.0)
+        self.assertAlmostEqual(float(out[1]), adc_main.REF, places=5)
+
+    def test_partial_batch_slice_matches_numpy(self):
+        raw = self._raw_batch()
+        out = np.full(raw.shape, -1.0, dtype=np.float32)
+        pending = 3
+        adc_main.raw_to_voltages(raw[:pending], out[:pending])
+
+        expected = np.empty((pending, raw.shape[1]), dtype=np.float32)
+        adc_main._scale_counts_numpy(raw[:pending].view(np.int32), expected)
+        np.testing.assert_array_equal(out[:pending], expected)
+        # แถวที่เกิน pending ต้องไม่ถูกเขียน
+        self.assertTrue(np.all(out[pending:] == -1.0))
+
+    @unittest.skipUnless(adc_main.NUMBA_AVAILABLE, "numba not installed")
+    def test_numba_matches_numpy_for_negative_counts(self):
+        raw = self._raw_batch().view(np.int32)
+        jit_out = np.empty(raw.shape, dtype=np.float32)
+        np_out = np.empty(raw.shape, dtype=np.float32)
+        adc_main._scale_counts_jit(raw, jit_out)
+        adc_main._scale_counts_numpy(raw, np_out)
+        np.testing.assert_array_equal(jit_out, np_out)
+
+        pending = 7
+        jit_out[:] = 0
+        np_out[:] = 0
+        adc_main._scale_counts_jit(raw[:pending], jit_out[:pending])
+        adc_main._scale_counts_numpy(raw[:pending], np_out[:pending])
+        np.testing.assert_array_equal(jit_out, np_out)
+
+
+class TestSensorDataCollectorChunks(unittest.TestCase):
+    def _batch(self, start, n, num_channels=3):
+        times = np.arange(start, start + n, dtype=np.float64) / 100.0
+        volts = (np.arange(start * num_channels, (start + n) * num_channels, dtype=np.float32)
+                 .reshape(n, num_channels))
+        return times, volts
+
+    def test_append_batch_spans_chunk_boundaries(self):
+        # buffer แรก 4 แถว, block ถัดไป 5 แถว — batch ละ 10 แถวข้ามหลาย block
+        with mock.patch.object(adc_main, "CHUNK_SIZE", 5):
+            collector = adc_main.SensorDataCollector(num_channels=3, buffer_size=4)
+            batches = [self._batch(0, 10), self._batch(10, 10), self._batch(20, 3)]
+            for times, volts in batches:
+                collector.append_batch(times, volts)
+
+        expected = np.column_stack([
+            np.concatenate([t for t, _ in batches]).astype(np.float32),
+            np.concatenate([v for _, v in batches]),
+        ])
+        self.assertEqual(collector.index, 23)
+        self.assertEqual([c.shape[0] for c in collector._chunks], [4, 5, 5, 5, 5])
+        np.testing.assert_array_equal(collector.data, expected)
+
+    def test_append_batch_mixed_with_next_row(self):
+        with mock.patch.object(adc_main, "CHUNK_SIZE", 4):
+            collector = adc_main.SensorDataCollector(num_channels=3, buffer_size=3)
+            times, volts = self._batch(0, 9)
+            collector.append(times[0], volts[0])
+            collector.append_batch(times[1:6], volts[1:6])
+            collector.append(times[6], volts[6])
+            collector.append_batch(times[7:], volts[7:])
+
+        expected = np.column_stack([times.astype(np.float32), volts])
+        self.assertEqual(collector.index, 9)
+        np.testing.assert_array_equal(collector.data, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""Round-trip tests for the hand-written npz writer/reader in reading/."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from reading.covert import convert_npz_to_csv, load_npz_array_mmap
+from reading.main import savez_chunks
+
+COLUMNS = np.array(['elapsed_time_sec', 'ss1', 'ss2', 'ss3'], dtype=np.str_)
+
+
+def _chunks(rows_per_chunk, num_cols=4, last_rows=None):
+    """block float32 แบบเดียวกับ SensorDataCollector — block สุดท้ายเป็น view ที่ตัดแถวได้"""
+    chunks = []
+    start = 0
+    for rows in rows_per_chunk:
+        block = np.arange(start * num_cols, (start + rows) * num_cols, dtype=np.float32)
+        chunks.append(block.reshape(rows, num_cols))
+        start += rows
+    if last_rows is not None:
+        chunks[-1] = chunks[-1][:last_rows]
+    return chunks
+
+
+class TestSavezChunks(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_multiple_chunks_with_partial_last_chunk(self):
+        chunks = _chunks([5, 5, 5], last_rows=2)
+        path = self.tmp / "multi.npz"
+        savez_chunks(path, chunks, columns=COLUMNS, sample_rate=100.0, num_channels=3)
+
+        with np.load(path) as npz:
+            np.testing.assert_array_equal(npz['data'], np.concatenate(chunks))
+            self.assertEqual(npz['data'].shape, (12, 4))
+            self.assertEqual(npz['data'].dtype, np.float32)
+            np.testing.assert_array_equal(npz['columns'], COLUMNS)
+            self.assertEqual(float(npz['sample_rate']), 100.0)
+            self.assertEqual(int(npz['num_channels']), 3)
+
+    def test_single_chunk(self):
+        chunks = _chunks([7])
+        path = self.tmp / "single.npz"
+        savez_chunks(path, chunks, columns=COLUMNS)
+
+        with np.load(path) as npz:
+            np.testing.assert_array_equal(npz['data'], chunks[0])
+
+    def test_empty_chunk_list(self):
+        path = self.tmp / "empty.npz"
+        savez_chunks(path, [], columns=COLUMNS)
+
+        with np.load(path) as npz:
+            self.assertEqual(npz['data'].shape, (0, 0))
+            self.assertEqual(npz['data'].dtype, np.float32)
+            np.testing.assert_array_equal(npz['columns'], COLUMNS)
+
+    def test_chunk_with_zero_rows(self):
+        chunks = _chunks([3, 4], last_rows=0)
+        path = self.tmp / "zero_rows.npz"
+        savez_chunks(path, chunks)
+
+        with np.load(path) as npz:
+            np.testing.assert_array_equal(npz['data'], chunks[0])
+
+
+class TestLoadNpzArrayMmap(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+        self.expected = np.concatenate(_chunks([6, 6], last_rows=3))
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _load(self, path):
+        """โหลดผ่าน load_npz_array_mmap แล้วคืน (ชนิด, สำเนา) — ปล่อย memmap ก่อนลบไฟล์"""
+        arr = load_npz_array_mmap(path, 'data')
+        kind = type(arr)
+        copy = np.array(arr)
+        del arr
+        return kind, copy
+
+    def test_savez_chunks_output_is_memory_mapped(self):
+        path = self.tmp / "chunks.npz"
+        savez_chunks(path, _chunks([6, 6], last_rows=3), columns=COLUMNS)
+
+        kind, data = self._load(path)
+        self.assertIs(kind, np.memmap)
+        np.testing.assert_array_equal(data, self.expected)
+
+    def test_np_savez_output_is_memory_mapped(self):
+        path = self.tmp / "savez.npz"
+        np.savez(path, data=self.expected, columns=COLUMNS)
+
+        kind, data = self._load(path)
+        self.assertIs(kind, np.memmap)
+        np.testing.assert_array_equal(data, self.expected)
+
+    def test_fortran_order_array(self):
+        path = self.tmp / "fortran.npz"
+        np.savez(path, data=np.asfortranarray(self.expected))
+
+        kind, data = self._load(path)
+        self.assertIs(kind, np.memmap)
+        np.testing.assert_array_equal(data, self.expected)
+
+    def test_compressed_falls_back_to_np_load(self):
+        path = self.tmp / "compressed.npz"
+        np.savez_compressed(path, data=self.expected, columns=COLUMNS)
+
+        kind, data = self._load(path)
+        self.assertIs(kind, np.ndarray)
+        np.testing.assert_array_equal(data, self.expected)
+
+    def test_empty_array_falls_back_to_np_load(self):
+        path = self.tmp / "empty.npz"
+        savez_chunks(path, [], columns=COLUMNS)
+
+        kind, data = self._load(path)
+        self.assertIs(kind, np.ndarray)
+        self.assertEqual(data.shape, (0, 0))
+
+
+class TestConvertNpzToCsv(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _convert(self, chunks):
+        """savez_chunks -> convert_npz_to_csv แล้วคืน (header, ข้อมูลที่อ่านกลับเป็น float32)"""
+        npz_path = self.tmp / "data.npz"
+        savez_chunks(npz_path, chunks, columns=COLUMNS)
+        csv_path = convert_npz_to_csv(npz_path, self.tmp)
+        self.assertEqual(csv_path, self.tmp / "data.csv")
+
+        with open(csv_path) as f:
+            header = f.readline().rstrip('\n').split(',')
+        with warnings.catch_warnings():
+            # ไฟล์ที่มีแต่ header — loadtxt เตือนว่าไม่มีข้อมูล
+            warnings.simplefilter("ignore", UserWarning)
+            data = np.loadtxt(csv_path, skiprows=1, delimiter=',', ndmin=2).astype(np.float32)
+        return header, data
+
+    def test_round_trip_is_exact(self):
+        rng = np.random.default_rng(0)
+        chunks = [
+            (rng.standard_normal((5, 4)) * 10.0 ** rng.integers(-6, 6, (5, 4))).astype(np.float32)
+            for _ in range(3)
+        ]
+        chunks[-1] = chunks[-1][:2]
+
+        header, data = self._convert(chunks)
+        self.assertEqual(header, COLUMNS.tolist())
+        np.testing.assert_array_equal(data, np.concatenate(chunks))
+
+    def test_zero_rows(self):
+        header, data = self._convert(_chunks([3], last_rows=0))
+        self.assertEqual(header, COLUMNS.tolist())
+        self.assertEqual(data.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()